@@ -0,0 +1,60 @@
+"""Compares the `formatTime` of log21's formatters with `logging.Formatter.formatTime`.
+
+Run it from the root of the repository:
+
+    python benchmarks/format_time.py
+"""
+
+import time
+import timeit
+import logging
+from typing import Optional
+
+import log21
+
+NUMBER = 100_000
+
+
+def make_records(count: int = NUMBER) -> list:
+    """Make records that are created 10 microseconds apart, like a busy logger."""
+    start = time.time()
+    records = []
+    for i in range(count):
+        record = logging.makeLogRecord({'msg': 'message'})
+        record.created = start + i / 100_000
+        record.msecs = (record.created - int(record.created)) * 1000
+        records.append(record)
+    return records
+
+
+def bench(
+    formatter: logging.Formatter, records: list, datefmt: Optional[str] = None
+) -> float:
+    """Return the seconds spent formatting the time of every record."""
+    format_time = formatter.formatTime
+    return min(
+        timeit.repeat(
+            lambda: [format_time(record, datefmt) for record in records],
+            number=1,
+            repeat=5
+        )
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    records = make_records()
+    formatters = {
+        'logging.Formatter': logging.Formatter(),
+        'log21.ColorizingFormatter': log21.ColorizingFormatter(),
+        'log21.DecolorizingFormatter': log21.DecolorizingFormatter()
+    }
+    for datefmt in (None, '%H:%M:%S'):
+        print(f'datefmt={datefmt!r}, {len(records)} records:')
+        for name, formatter in formatters.items():
+            seconds = bench(formatter, records, datefmt)
+            print(f'    {name:28} {seconds * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -7,12 +7,14 @@ import os as _os
 import sys as _sys
 import logging as _logging
 from types import ModuleType as _ModuleType
-from typing import (Type as _Type, Union as _Union, Literal as _Literal,
-                    Mapping as _Mapping, Iterable as _Iterable, Optional as _Optional)
+from typing import (Any as _Any, List as _List, Type as _Type, Union as _Union,
+                    Literal as _Literal, Mapping as _Mapping, Iterable as _Iterable,
+                    Optional as _Optional)
 
 import log21.helper_types
 
 from . import crash_reporter
+from .aggregator import LogAggregator, worker_handler as _worker_handler
 from .colors import (Colors, get_color, get_colors, ansi_escape, closest_color,
                      get_color_name)
 from .levels import INFO, WARN, DEBUG, ERROR, FATAL, INPUT, NOTSET, WARNING, CRITICAL
@@ -21,14 +23,20 @@ from .pprint import PrettyPrinter, pformat
 from .manager import Manager
 from .argparse import ColorizingArgumentParser
 from .formatters import ColorizingFormatter, DecolorizingFormatter, _Formatter
+from .helper_types import FileSize as _FileSize
 from .tree_print import TreePrint, tree_format
 from .argumentify import (ArgumentError, TooFewArgumentsError, RequiredArgumentError,
                           IncompatibleArgumentsError, argumentify)
-from .file_handler import FileHandler, DecolorizingFileHandler
+from .file_handler import (FileHandler, BinaryFileHandler, RotatingFileHandler,
+                           CompressedFileHandler, DecolorizingFileHandler,
+                           GroupCommitFileHandler, TimedRotatingFileHandler,
+                           AsyncDecolorizingFileHandler)
 from .progress_bar import ProgressBar
 from ._module_helper import FakeModule as _FakeModule
 from .logging_window import LoggingWindow, LoggingWindowHandler
-from .stream_handler import StreamHandler, ColorizingStreamHandler
+from .queue_handler import QueueHandler, OverloadQueue, QueueListener, make_async
+from .stream_handler import (StreamHandler, ColorizingStreamHandler,
+                             AsyncColorizingStreamHandler)
 
 # yapf: enable
 
@@ -46,7 +54,11 @@ __all__ = [
     'log', 'basic_config', 'basicConfig', 'ProgressBar', 'LoggingWindow',
     'LoggingWindowHandler', 'get_logging_window', 'crash_reporter', 'console_reporter',
     'file_reporter', 'argumentify', 'ArgumentError', 'IncompatibleArgumentsError',
-    'RequiredArgumentError', 'TooFewArgumentsError', 'FileHandler'
+    'RequiredArgumentError', 'TooFewArgumentsError', 'FileHandler', 'QueueHandler',
+    'QueueListener', 'OverloadQueue', 'AsyncColorizingStreamHandler',
+    'AsyncDecolorizingFileHandler', 'LogAggregator', 'RotatingFileHandler',
+    'TimedRotatingFileHandler', 'GroupCommitFileHandler', 'CompressedFileHandler',
+    'BinaryFileHandler'
 ]
 
 _manager = Manager()
@@ -106,6 +118,19 @@ def _prepare_formatter(
     return formatter
 
 
+def _async_handlers(handlers: _List[_logging.Handler],
+                    async_: _Any) -> _List[_logging.Handler]:
+    """Move the handlers behind a QueueHandler if `async_` is set.
+
+    :param handlers: The handlers to use.
+    :param async_: False, True or the queue to use.
+    :return: The handlers to add to the logger.
+    """
+    if async_ is False or async_ is None:
+        return handlers
+    return [make_async(*handlers, queue=None if async_ is True else async_)]
+
+
 def get_logger(
     name: str = '',
     level: _Union[int, str] = NOTSET,
@@ -124,6 +149,10 @@ def get_logger(
     file: _Optional[_Union[_os.PathLike, str]] = None,
     file_mode: _Optional[str] = None,
     file_encoding: _Optional[str] = None,
+    async_: _Any = False,
+    colorize: _Optional[bool] = None,
+    max_size: _Optional[_Union[_FileSize, str, int]] = None,
+    backup_count: int = 0,
 ) -> Logger:
     """Returns a logging.Logger with colorizing support.
 
@@ -192,10 +221,28 @@ def get_logger(
     :param file: Union[os.PathLike, str] = None: The file path to log to
     :param file_mode: str = None: The mode to open file at (Defaults to 'a')
     :param file_encoding: str = None: The file encoding
+    :param async_: Union[bool, queue.Queue] = False: Put the records in a queue and
+        let a background thread format and write them. A queue object may be passed
+        to be used instead of the default unbounded queue, e.g. an OverloadQueue to
+        drop or sample the records when the output can't keep up. The statistics of the
+        queue are available through the `stats` method of the logger's QueueHandler.
+    :param colorize: Optional[bool] = None: Whether to write colors to the console.
+        None means to write them only if the console supports them (it is a terminal,
+        NO_COLOR is not set, etc.)
+    :param max_size: Union[FileSize, str, int] = None: The maximum size of the file,
+        e.g. "512MiB"; a new file is started when it is reached. Requires `file`
+    :param backup_count: int = 0: The number of the old files to keep when `max_size`
+        is set. Requires `file` and `max_size`
+    :raises ValueError: If `max_size` or `backup_count` is given without `file`, or
+        `backup_count` without `max_size`
     :return: log21.Logger
     """
     if not isinstance(name, str):
         raise TypeError('A logger name must be a string')
+    if (max_size or backup_count) and not file:
+        raise ValueError('`max_size` and `backup_count` can only be used with `file`')
+    if backup_count and not max_size:
+        raise ValueError('`backup_count` can only be used with `max_size`')
     logger = None
     if name:
         logger = _manager.getLogger(name)
@@ -209,31 +256,40 @@ def get_logger(
         # Defines the handler
         handler = ColorizingStreamHandler(
             handle_carriage_return=handle_carriage_return,
-            handle_new_line=handle_new_line
+            handle_new_line=handle_new_line,
+            colorize=colorize
         )
         handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        handlers: _List[_logging.Handler] = [handler]
         if level_names:
             logger.add_levels(level_names, errors='ignore')
         _manager.addLogger(name, logger)
 
-        if file:
-            file_handler = DecolorizingFileHandler(
-                file, mode=file_mode or 'a', encoding=file_encoding
-            )
-            file_formatter = _prepare_formatter(
-                fmt,
-                style,
-                datefmt,
-                show_level,
-                show_time,
-                False,
-                level_names,
-                formatter_class=DecolorizingFormatter,
-                prefix_carriage_return=False,
+        if _worker_handler() is not None:
+            # In a worker of a LogAggregator the records are handled by the parent
+            handlers = [_worker_handler()]
+        elif file:
+            if max_size:
+                file_handler: DecolorizingFileHandler = RotatingFileHandler(
+                    file,
+                    mode=file_mode or 'a',
+                    max_bytes=max_size,
+                    backup_count=backup_count,
+                    encoding=file_encoding
+                )
+            else:
+                file_handler = DecolorizingFileHandler(
+                    file, mode=file_mode or 'a', encoding=file_encoding
+                )
+            # Shares the rendering of the console's formatter, so each record is
+            # formatted once for both
+            file_handler.setFormatter(
+                formatter.linked_plain_formatter(strip_carriage_return=not fmt)
             )
-            file_handler.setFormatter(file_formatter)
-            logger.addHandler(file_handler)
+            handlers.append(file_handler)
+
+        for handler in _async_handlers(handlers, async_):
+            logger.addHandler(handler)
 
     return logger  # ty: ignore[invalid-return-type]
 
@@ -460,7 +516,9 @@ def basic_config(
     date_format: str = '%H:%M:%S',
     style: str = '%',
     format_: _Optional[str] = None,
-    level: _Optional[_Union[int, str]] = None
+    level: _Optional[_Union[int, str]] = None,
+    async_: _Any = False,
+    colorize: _Optional[bool] = None
 ) -> None:  # pylint: disable=too-many-branches
     """Do basic configuration for the logging system.
 
@@ -505,6 +563,12 @@ def basic_config(
               created FileHandler, causing it to be used when the file is
               opened in text mode. If not specified, the default value is
               `backslashreplace`.
+    async_    If specified as true, the handlers are owned by a background
+              thread that formats and writes the records that the root logger
+              puts in a queue. A queue object may be passed instead of true.
+    colorize  Whether the created ColorizingStreamHandler writes colors. If
+              not specified, the colors are only written if the stream
+              supports them.
 
     Note that you could specify a stream created using open(filename, mode)
     rather than passing the filename and mode in. However, it should be
@@ -537,7 +601,7 @@ def basic_config(
                     filename, filemode, encoding=encoding, errors=errors
                 )
             else:
-                handler = ColorizingStreamHandler(stream=stream)
+                handler = ColorizingStreamHandler(stream=stream, colorize=colorize)
             handlers = [handler]
         if style not in '%{$':
             raise ValueError('Style must be one of: %, {, $')
@@ -551,6 +615,7 @@ def basic_config(
         for handler in handlers:
             if handler.formatter is None:
                 handler.setFormatter(formatter)
+        for handler in _async_handlers(list(handlers), async_):
             root.addHandler(handler)
     if level is not None:
         root.setLevel(level)
@@ -0,0 +1,498 @@
+# log21._binary_format.py
+# CodeWriter21
+"""The binary log format of BinaryFileHandler.
+
+A file starts with `MAGIC` and the version, and is followed by entries that each start
+with their type:
+
++ STRING: A string of the string table (a message template, a logger name, a level
+  name, a path, ...) with its id.
++ SITE: A call site: the ids of its message template, logger name, level name, path
+  and function name, and its level and line number.
++ THREAD: A process and thread, with the id of the name of the thread.
++ RECORD: The ids of the call site and the thread of a record, its time and its
+  serialized arguments.
++ RESET: The next entries don't use the tables that were written before it (e.g. a
+  process appended to the file).
+
+The STRING, SITE and THREAD entries are written right before their first use, so the
+records of a call site repeat nothing but their time and arguments.
+"""
+
+# yapf: disable
+
+import struct as _struct
+from decimal import Decimal as _Decimal
+from numbers import Real as _Real, Integral as _Integral
+from typing import (IO as _IO, Any as _Any, Dict as _Dict, List as _List,
+                    Tuple as _Tuple, Iterator as _Iterator, Optional as _Optional)
+
+# yapf: enable
+
+MAGIC = b'LOG21BIN'
+VERSION = 1
+HEADER = _struct.Struct('<8sH')
+
+STRING = 1
+SITE = 2
+THREAD = 3
+RECORD = 4
+RESET = 5
+
+# type, id, length
+STRING_ENTRY = _struct.Struct('<BII')
+# type, id, the ids of the template, the end, the logger name, the level name, the
+# path and the function name, the level, the line number
+SITE_ENTRY = _struct.Struct('<BIIIIIIIii')
+# type, id, the id of the thread name, the process, the thread
+THREAD_ENTRY = _struct.Struct('<BIIiQ')
+# type, flags, the id of the call site, the id of the thread, the time, the number of
+# arguments (the parts of a joined message)
+RECORD_ENTRY = _struct.Struct('<BBIIdH')
+
+# The flags of a record
+JOINED = 1  # The message is the arguments joined with spaces and the end
+NO_TEMPLATE = 2  # The template is not the first part of a joined message
+MAPPING = 4  # The arguments are the keys and the values of a mapping
+EXC_TEXT = 8  # A string value with the traceback follows the arguments
+STACK_INFO = 16  # A string value with the stack information follows
+# The `args` of a joined message follow its parts: their number and their values (the
+# keys and the values with MAPPING)
+JOINED_ARGS = 32
+
+# The tags of the serialized values
+_NONE = b'N'
+_TRUE = b'T'
+_FALSE = b'F'
+_INT32 = b'j'
+_INT = b'i'
+_BIG_INT = b'I'
+_FLOAT = b'f'
+_SHORT_STR = b'c'
+_STR = b's'
+_BYTES = b'b'
+_OBJECT = b'o'
+_INT_OBJECT = b'J'
+_FLOAT_OBJECT = b'G'
+
+_count = _struct.Struct('<H')
+_int32 = _struct.Struct('<i')
+_int64 = _struct.Struct('<q')
+_float64 = _struct.Struct('<d')
+_length = _struct.Struct('<I')
+
+
+def _pack_text(buffer: bytearray, text: str) -> None:
+    data = text.encode('utf-8', 'surrogatepass')
+    buffer += _length.pack(len(data))
+    buffer += data
+
+
+def pack_value(buffer: bytearray, value: _Any) -> None:  # noqa: ANN401
+    """Serialize a value at the end of the buffer.
+
+    Numbers, strings, bytes, booleans and None keep their types. Other numbers (e.g.
+    IntEnum members, Decimals, numpy scalars) are kept as an int or a float along with
+    their `str` and `repr`, and the rest of the objects as their `str` and `repr`.
+
+    :param buffer: The buffer.
+    :param value: The value.
+    """
+    value_type = type(value)
+    if value_type is str:
+        data = value.encode('utf-8', 'surrogatepass')
+        if len(data) < 256:
+            buffer += _SHORT_STR
+            buffer.append(len(data))
+        else:
+            buffer += _STR
+            buffer += _length.pack(len(data))
+        buffer += data
+    elif value_type is int:
+        if -0x80000000 <= value <= 0x7FFFFFFF:
+            buffer += _INT32
+            buffer += _int32.pack(value)
+        elif -0x8000000000000000 <= value <= 0x7FFFFFFFFFFFFFFF:
+            buffer += _INT
+            buffer += _int64.pack(value)
+        else:
+            buffer += _BIG_INT
+            _pack_text(buffer, str(value))
+    elif value_type is float:
+        buffer += _FLOAT
+        buffer += _float64.pack(value)
+    elif value is None:
+        buffer += _NONE
+    elif value is True:
+        buffer += _TRUE
+    elif value is False:
+        buffer += _FALSE
+    elif value_type is bytes:
+        buffer += _BYTES
+        buffer += _length.pack(len(value))
+        buffer += value
+    elif isinstance(value, _Integral):
+        buffer += _INT_OBJECT
+        _pack_text(buffer, str(int(value)))
+        _pack_text(buffer, str(value))
+        _pack_text(buffer, repr(value))
+    elif isinstance(value, (_Real, _Decimal)):
+        buffer += _FLOAT_OBJECT
+        buffer += _float64.pack(float(value))
+        _pack_text(buffer, str(value))
+        _pack_text(buffer, repr(value))
+    else:
+        buffer += _OBJECT
+        _pack_text(buffer, str(value))
+        _pack_text(buffer, repr(value))
+
+
+def _pack_arguments(buffer: bytearray, args: _Any) -> bool:  # noqa: ANN401
+    """Serialize the values of a tuple or a mapping of arguments.
+
+    :return: Whether the arguments are a mapping.
+    """
+    if isinstance(args, dict):
+        for key, value in args.items():
+            pack_value(buffer, key)
+            pack_value(buffer, value)
+        return True
+    for value in args:
+        pack_value(buffer, value)
+    return False
+
+
+class RenderedObject(str):
+    """An argument that was neither a number nor a string, as it was rendered when it
+    was logged."""
+    __slots__ = ('representation', )
+
+    def __new__(cls, text: str, representation: str) -> 'RenderedObject':
+        self = super().__new__(cls, text)
+        self.representation = representation
+        return self
+
+    def __repr__(self) -> str:
+        return self.representation
+
+
+class RenderedInt(int):
+    """An integer argument of another type than int (e.g. an IntEnum member), which
+    formats as a number and has the `str` and the `repr` it had when it was logged."""
+
+    def __new__(cls, value: int, text: str, representation: str) -> 'RenderedInt':
+        self = super().__new__(cls, value)
+        self.text = text
+        self.representation = representation
+        return self
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return self.representation
+
+    def __format__(self, format_spec: str) -> str:
+        return self.text if not format_spec else super().__format__(format_spec)
+
+
+class RenderedFloat(float):
+    """A real number argument of another type than int and float (e.g. a Decimal or a
+    numpy scalar), which formats as a float and has the `str` and the `repr` it had
+    when it was logged."""
+    __slots__ = ('text', 'representation')
+
+    def __new__(
+        cls, value: float, text: str, representation: str
+    ) -> 'RenderedFloat':
+        self = super().__new__(cls, value)
+        self.text = text
+        self.representation = representation
+        return self
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return self.representation
+
+    def __format__(self, format_spec: str) -> str:
+        return self.text if not format_spec else super().__format__(format_spec)
+
+
+class TruncatedError(Exception):
+    """The file ends in the middle of an entry."""
+
+
+class _Reader:
+    """Reads the values of a file, raising TruncatedError at an early end."""
+
+    def __init__(self, file: _IO[bytes]) -> None:
+        self.file = file
+
+    def read(self, size: int) -> bytes:
+        data = self.file.read(size)
+        if len(data) != size:
+            raise TruncatedError
+        return data
+
+    def unpack(self, structure: _struct.Struct) -> tuple:
+        return structure.unpack(self.read(structure.size))
+
+    def text(self) -> str:
+        return self.read(self.unpack(_length)[0]).decode('utf-8', 'surrogatepass')
+
+    def arguments(self, count: int, mapping: bool) -> _Any:  # noqa: ANN401
+        if mapping:
+            values: _List[_Any] = [self.value() for _ in range(count * 2)]
+            return dict(zip(values[::2], values[1::2]))
+        return tuple(self.value() for _ in range(count))
+
+    def value(self) -> _Any:  # noqa: ANN401
+        # pylint: disable=too-many-return-statements
+        tag = self.read(1)
+        if tag == _SHORT_STR:
+            return self.read(self.read(1)[0]).decode('utf-8', 'surrogatepass')
+        if tag == _INT32:
+            return self.unpack(_int32)[0]
+        if tag == _FLOAT:
+            return self.unpack(_float64)[0]
+        if tag == _STR:
+            return self.text()
+        if tag == _INT:
+            return self.unpack(_int64)[0]
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _BIG_INT:
+            return int(self.text())
+        if tag == _BYTES:
+            return self.read(self.unpack(_length)[0])
+        if tag == _OBJECT:
+            text = self.text()
+            return RenderedObject(text, self.text())
+        if tag == _INT_OBJECT:
+            value = int(self.text())
+            text = self.text()
+            return RenderedInt(value, text, self.text())
+        if tag == _FLOAT_OBJECT:
+            value = self.unpack(_float64)[0]
+            text = self.text()
+            return RenderedFloat(value, text, self.text())
+        raise ValueError(f'Unknown value tag: {tag!r}')
+
+
+def read_records(file: _IO[bytes]) -> _Iterator[_Dict[str, _Any]]:
+    """Read the records of a binary log file.
+
+    A record that was cut off at the end of the file (e.g. by a crash) is left out.
+
+    :param file: The file, opened in binary mode.
+    :raises ValueError: If the file is not a binary log21 log.
+    :return: An iterator of dictionaries of the attributes of the records.
+    """
+    reader = _Reader(file)
+    header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        # An empty file, or one whose header was cut off
+        if not MAGIC.startswith(header[:len(MAGIC)]):
+            raise ValueError('Not a binary log21 log file')
+        return
+    magic, version = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError('Not a binary log21 log file')
+    if version > VERSION:
+        raise ValueError(f'Unsupported binary log version: {version}')
+    strings: _Dict[int, str] = {}
+    sites: _Dict[int, tuple] = {}
+    threads: _Dict[int, tuple] = {}
+    try:
+        while True:
+            kind = file.read(1)
+            if not kind:
+                return
+            file.seek(-1, 1)
+            if kind[0] == RECORD:
+                yield _read_record(reader, strings, sites, threads)
+            elif kind[0] == STRING:
+                _, string_id, length = reader.unpack(STRING_ENTRY)
+                strings[string_id] = reader.read(length).decode(
+                    'utf-8', 'surrogatepass'
+                )
+            elif kind[0] == SITE:
+                _, site_id, *string_ids, levelno, lineno = reader.unpack(SITE_ENTRY)
+                sites[site_id] = (*[strings[i] for i in string_ids], levelno, lineno)
+            elif kind[0] == THREAD:
+                _, thread_id, name_id, process, thread = reader.unpack(THREAD_ENTRY)
+                threads[thread_id] = (
+                    strings[name_id], process if process >= 0 else None, thread
+                )
+            elif kind[0] == RESET:
+                file.read(1)
+                strings.clear()
+                sites.clear()
+                threads.clear()
+            else:
+                raise ValueError(f'Unknown entry type: {kind[0]}')
+    except TruncatedError:
+        return
+
+
+def _read_record(
+    reader: _Reader, strings: _Dict[int, str], sites: _Dict[int, tuple],
+    threads: _Dict[int, tuple]
+) -> _Dict[str, _Any]:
+    _, flags, site_id, thread_id, created, count = reader.unpack(RECORD_ENTRY)
+    template, end, name, levelname, pathname, func_name, levelno, lineno = sites[
+        site_id]
+    thread_name, process, thread = threads[thread_id]
+    if flags & JOINED:
+        parts = [reader.value() for _ in range(count)]
+        if not flags & NO_TEMPLATE:
+            parts.insert(0, template)
+        msg: str = ' '.join([str(part) for part in parts]) + end
+        args: _Any = ()
+        if flags & JOINED_ARGS:
+            args = reader.arguments(reader.unpack(_count)[0], bool(flags & MAPPING))
+    else:
+        msg = template
+        args = reader.arguments(count, bool(flags & MAPPING))
+    exc_text = reader.value() if flags & EXC_TEXT else None
+    stack_info = reader.value() if flags & STACK_INFO else None
+    return {
+        'name': name,
+        'msg': msg,
+        'args': args,
+        'levelname': levelname,
+        'levelno': levelno,
+        'pathname': pathname,
+        'lineno': lineno,
+        'funcName': func_name,
+        'created': created,
+        'thread': thread,
+        'threadName': thread_name,
+        'process': process,
+        'exc_text': exc_text,
+        'stack_info': stack_info
+    }
+
+
+class Writer:
+    """Serializes records, interning their strings, call sites and threads."""
+
+    def __init__(self, max_table_size: int = 65536) -> None:
+        """Initialize the writer.
+
+        :param max_table_size: The number of the interned strings, call sites and
+            threads that makes the writer start new tables, so messages that are all
+            different (e.g. f-strings) can't make them grow without bound.
+        """
+        self.max_table_size = max_table_size
+        self._strings: _Dict[str, int] = {}
+        self._sites: _Dict[tuple, int] = {}
+        self._threads: _Dict[tuple, int] = {}
+
+    def reset(self, appending: bool) -> bytes:
+        """Forget the tables; for a new file or one that is appended to.
+
+        :param appending: Whether the file already has entries.
+        :return: The bytes that start the file, or the RESET entry.
+        """
+        self._strings.clear()
+        self._sites.clear()
+        self._threads.clear()
+        if appending:
+            return bytes((RESET, ))
+        return HEADER.pack(MAGIC, VERSION)
+
+    def _intern(self, buffer: bytearray, text: _Optional[str]) -> int:
+        if text is None:
+            text = ''
+        string_id = self._strings.get(text)
+        if string_id is None:
+            string_id = self._strings[text] = len(self._strings)
+            data = text.encode('utf-8', 'surrogatepass')
+            buffer += STRING_ENTRY.pack(STRING, string_id, len(data))
+            buffer += data
+        return string_id
+
+    def _site(
+        self,
+        buffer: bytearray,
+        record,  # noqa: ANN001
+        template: str,
+        end: str
+    ) -> int:
+        key = (
+            template, end, record.name, record.levelname, record.pathname,
+            record.funcName, record.levelno, record.lineno
+        )
+        site_id = self._sites.get(key)
+        if site_id is None:
+            string_ids = [self._intern(buffer, text) for text in key[:6]]
+            site_id = self._sites[key] = len(self._sites)
+            buffer += SITE_ENTRY.pack(
+                SITE, site_id, *string_ids, record.levelno, record.lineno or 0
+            )
+        return site_id
+
+    def _thread(self, buffer: bytearray, record) -> int:  # noqa: ANN001
+        key = (record.threadName, record.process, record.thread)
+        thread_id = self._threads.get(key)
+        if thread_id is None:
+            name_id = self._intern(buffer, record.threadName)
+            thread_id = self._threads[key] = len(self._threads)
+            buffer += THREAD_ENTRY.pack(
+                THREAD, thread_id, name_id,
+                -1 if record.process is None else record.process, record.thread or 0
+            )
+        return thread_id
+
+    def pack_record(
+        self,
+        buffer: bytearray,
+        record,  # noqa: ANN001
+        message: _Tuple[int, str, str, tuple, _Any, _Optional[str]]
+    ) -> None:
+        """Serialize a record at the end of the buffer.
+
+        :param buffer: The buffer.
+        :param record: The LogRecord.
+        :param message: The flags, the template, the end, the parts (of a joined
+            message) and the arguments of the message, and the traceback text.
+        """
+        flags, template, end, parts, args, exc_text = message
+        # The values are serialized first, so an argument that fails to render leaves
+        # neither the buffer nor the tables half updated
+        values = bytearray()
+        if flags & JOINED:
+            count = len(parts)
+            for part in parts:
+                pack_value(values, part)
+            if args:
+                flags |= JOINED_ARGS
+                values += _count.pack(len(args))
+        else:
+            count = len(args)
+        if args and _pack_arguments(values, args):
+            flags |= MAPPING
+        if exc_text:
+            flags |= EXC_TEXT
+            pack_value(values, exc_text)
+        if record.stack_info:
+            flags |= STACK_INFO
+            pack_value(values, record.stack_info)
+        if (
+            len(self._strings) + len(self._sites) + len(self._threads)
+            >= self.max_table_size
+        ):
+            buffer += self.reset(True)
+        site_id = self._site(buffer, record, template, end)
+        thread_id = self._thread(buffer, record)
+        buffer += RECORD_ENTRY.pack(
+            RECORD, flags, site_id, thread_id, record.created, count
+        )
+        buffer += values
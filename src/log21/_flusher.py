@@ -0,0 +1,104 @@
+# log21._flusher.py
+# CodeWriter21
+
+# yapf: disable
+
+import os as _os
+import sys as _sys
+import logging as _logging
+import weakref as _weakref
+import threading as _threading
+import traceback as _traceback
+from typing import Callable as _Callable, Optional as _Optional
+
+# yapf: enable
+
+__all__ = ['PeriodicFlusher']
+
+
+class PeriodicFlusher:
+    """Calls a method of a handler some seconds after it is scheduled, from one
+    long-lived daemon thread instead of a new `threading.Timer` thread every time.
+
+    Scheduling it again before the call does nothing, so a burst of records leads to a
+    single call. Only a weak reference to the method is kept: the thread ends when the
+    handler is garbage collected, if it isn't stopped before.
+    """
+
+    def __init__(
+        self, method: _Callable[[], None], interval: float, name: str = 'log21-flush'
+    ) -> None:
+        """Initialize the flusher; the thread is started by the first `schedule`.
+
+        :param method: The bound method to call.
+        :param interval: The number of seconds between scheduling and the call.
+        :param name: The name of the thread.
+        """
+        self._method = _weakref.WeakMethod(method)
+        self.interval = interval
+        self.name = name
+        self._scheduled = _threading.Event()
+        self._stopped = _threading.Event()
+        self._lock = _threading.Lock()
+        self._thread: _Optional[_threading.Thread] = None
+        self._pid = 0
+        self._delay = interval
+
+    def schedule(self, delay: _Optional[float] = None) -> None:
+        """Make the thread call the method in `delay` seconds, unless a call is
+        already waiting.
+
+        :param delay: The number of seconds to wait. None means `interval`.
+        """
+        if self._scheduled.is_set():
+            return
+        self._delay = self.interval if delay is None else delay
+        # A forked process has the flusher but not its thread
+        if self._pid != _os.getpid():
+            with self._lock:
+                if self._stopped.is_set():
+                    return
+                if self._pid != _os.getpid():
+                    self._thread = _threading.Thread(
+                        target=self._run, name=self.name, daemon=True
+                    )
+                    self._thread.start()
+                    self._pid = _os.getpid()
+        self._scheduled.set()
+
+    def _run(self) -> None:
+        scheduled = self._scheduled
+        stopped = self._stopped
+        while True:
+            if not scheduled.wait(60):
+                if self._method() is None:
+                    return
+                continue
+            if stopped.wait(self._delay):
+                return
+            scheduled.clear()
+            method = self._method()
+            if method is None:
+                return
+            try:
+                method()
+            except Exception:  # pylint: disable=broad-except
+                if _logging.raiseExceptions:
+                    _traceback.print_exc(file=_sys.stderr)
+            del method
+
+    def stop(self) -> None:
+        """Stop the thread without calling the method again.
+
+        It waits for a call that is running, so it must not be called while holding a
+        lock that the method takes.
+        """
+        with self._lock:
+            self._stopped.set()
+            self._scheduled.set()
+            thread = self._thread
+        if (
+            thread is not None and self._pid == _os.getpid()
+            and thread is not _threading.current_thread()
+        ):
+            thread.join()
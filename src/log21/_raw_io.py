@@ -0,0 +1,366 @@
+# log21._raw_io.py
+# CodeWriter21
+
+# yapf: disable
+
+import os as _os
+import stat as _stat
+import time as _time
+import select as _select
+import warnings as _warnings
+from typing import (IO as _IO, Any as _Any, Dict as _Dict, Union as _Union,
+                    Iterable as _Iterable, Optional as _Optional)
+
+# yapf: enable
+
+__all__ = [
+    'NonBlockingWriter', 'RawWriter', 'open_non_blocking_writer', 'open_raw_writer',
+    'reopen', 'write_all'
+]
+
+
+def write_all(file_descriptor: int, data) -> None:  # noqa: ANN001
+    """Write all the bytes to the file descriptor, however many calls it takes.
+
+    :param file_descriptor: The file descriptor to write to.
+    :param data: A bytes-like object.
+    """
+    view = memoryview(data)
+    while view:
+        written = _os.write(file_descriptor, view)
+        view = view[written:]
+
+
+class RawWriter:
+    """Encodes text and writes it to a file descriptor with `os.write`, without the
+    text and the buffer layers of a stream.
+
+    Several texts are encoded into one reusable bytearray and written at once.
+    """
+
+    def __init__(
+        self, file_descriptor: int, encoding: str = 'utf-8', errors: str = 'strict'
+    ) -> None:
+        """Initialize the writer.
+
+        :param file_descriptor: The file descriptor to write to.
+        :param encoding: The encoding of the text.
+        :param errors: The error handling scheme of the encoding.
+        """
+        self.file_descriptor = file_descriptor
+        self.encoding = encoding
+        self.errors = errors
+        self._buffer = bytearray()
+
+    def write(self, text: str) -> None:
+        """Encode the text and write it."""
+        self.write_bytes(text.encode(self.encoding, self.errors))
+
+    def write_many(self, texts: _Iterable[str]) -> None:
+        """Encode the texts into the buffer and write them at once."""
+        buffer = self._buffer
+        size = 0
+        for text in texts:
+            data = text.encode(self.encoding, self.errors)
+            # Assigning to a slice of the same length doesn't reallocate the buffer
+            buffer[size:size + len(data)] = data
+            size += len(data)
+        self.write_bytes(memoryview(buffer)[:size])
+
+    def write_bytes(self, data) -> None:  # noqa: ANN001
+        """Write the encoded bytes."""
+        write_all(self.file_descriptor, data)
+
+    def flush(self) -> None:
+        """Write whatever is held back; a RawWriter holds nothing back."""
+
+    def close(self) -> None:
+        """Release the resources of the writer; the file descriptor is not closed."""
+
+
+def open_raw_writer(stream) -> _Optional[RawWriter]:  # noqa: ANN001
+    """Make a RawWriter for the file descriptor of a text stream.
+
+    The stream is flushed, so what it holds is written before the raw output. On
+    Windows the text layer translates the new lines, so it is never bypassed.
+
+    :param stream: The stream.
+    :return: The RawWriter or None if the stream has no file descriptor.
+    """
+    if _os.name == 'nt':
+        return None
+    try:
+        file_descriptor = stream.fileno()
+        stream.flush()
+    except (AttributeError, ValueError, OSError):
+        return None
+    return RawWriter(
+        file_descriptor,
+        getattr(stream, 'encoding', None) or 'utf-8',
+        getattr(stream, 'errors', None) or 'strict'
+    )
+
+
+def reopen(stream) -> _Optional[int]:  # noqa: ANN001
+    """Open the terminal or the pipe of a stream once more.
+
+    The new file descriptor has its own open file, so making it non-blocking doesn't
+    affect the stream that the rest of the program writes to. Terminals are reopened
+    through their name on every Unix; pipes only through `/proc/self/fd`, which is
+    Linux only (`/dev/fd` of macOS and the BSDs duplicates the descriptor, sharing its
+    open file).
+
+    :param stream: The stream.
+    :return: The new file descriptor or None if the stream can't be opened again.
+    """
+    if _os.name == 'nt':
+        return None
+    try:
+        file_descriptor = stream.fileno()
+        mode = _os.fstat(file_descriptor).st_mode
+        if _stat.S_ISCHR(mode) and _os.isatty(file_descriptor):
+            path = _os.ttyname(file_descriptor)
+        elif _stat.S_ISFIFO(mode) and _os.path.isdir('/proc/self/fd'):
+            path = f'/proc/self/fd/{file_descriptor}'
+        else:
+            return None
+        return _os.open(path, _os.O_WRONLY | getattr(_os, 'O_NOCTTY', 0))
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class NonBlockingWriter(RawWriter):
+    """A RawWriter for a non-blocking file descriptor, which never makes the logging
+    thread wait for a slow reader longer than it is allowed to.
+
+    What the reader doesn't take right away is kept in a bounded spill buffer and
+    written before the next output. When the spill buffer is full, the policy decides
+    what happens to the new output:
+
+    * `policy='wait'` waits for the reader for up to `timeout` seconds and drops the
+      output if the reader doesn't make room in time. Until the reader takes something
+      again, the next outputs are dropped without waiting.
+    * `policy='drop'` drops the output.
+    * `policy='divert'` writes the output to `divert_file` instead.
+
+    Output is only dropped or diverted as a whole, so the reader never gets a part of a
+    record.
+    """
+
+    def __init__(
+        self,
+        file_descriptor: int,
+        encoding: str = 'utf-8',
+        errors: str = 'strict',
+        spill_size: int = 1024 * 1024,
+        policy: str = 'wait',
+        timeout: float = 1.0,
+        divert_file: _Optional[_Union[str, _os.PathLike]] = None,
+        close_file_descriptor: bool = False
+    ) -> None:
+        """Initialize the writer and make the file descriptor non-blocking.
+
+        :param file_descriptor: The file descriptor to write to.
+        :param encoding: The encoding of the text.
+        :param errors: The error handling scheme of the encoding.
+        :param spill_size: The maximum number of bytes to hold while the reader is
+            slow.
+        :param policy: What to do when the spill buffer is full: 'wait', 'drop' or
+            'divert'.
+        :param timeout: The maximum number of seconds to wait for the reader with the
+            'wait' policy.
+        :param divert_file: The path of the file that the output goes to with the
+            'divert' policy.
+        :param close_file_descriptor: Whether to close the file descriptor when the
+            writer is closed.
+        """
+        if policy not in ('wait', 'drop', 'divert'):
+            raise ValueError("`policy` must be one of: 'wait', 'drop', 'divert'")
+        if policy == 'divert' and divert_file is None:
+            raise ValueError("`divert_file` is required for the 'divert' policy")
+        super().__init__(file_descriptor, encoding, errors)
+        _os.set_blocking(file_descriptor, False)
+        self.spill_size = spill_size
+        self.policy = policy
+        self.timeout = timeout
+        self.divert_file = divert_file
+        self.close_file_descriptor = close_file_descriptor
+        self._divert: _Optional[_IO[bytes]] = None
+        self._spill = bytearray()
+        # Set when waiting for the reader timed out, so the next outputs don't wait
+        # for a reader that is stuck; cleared when the reader takes something again
+        self._stalled = False
+        self.bytes_written = 0
+        self.bytes_delayed = 0
+        self.bytes_dropped = 0
+        self.bytes_diverted = 0
+        self.writes_dropped = 0
+        self.writes_diverted = 0
+
+    def _write_some(self, data) -> int:  # noqa: ANN001
+        """Write as much of the data as the reader takes without waiting.
+
+        :return: The number of written bytes.
+        """
+        try:
+            written = _os.write(self.file_descriptor, data)
+        except (BlockingIOError, InterruptedError):
+            return 0
+        self.bytes_written += written
+        return written
+
+    def _drain(self) -> bool:
+        """Write as much of the spill buffer as the reader takes without waiting.
+
+        :return: True if the spill buffer is empty.
+        """
+        spill = self._spill
+        while spill:
+            written = self._write_some(spill)
+            if not written:
+                return False
+            del spill[:written]
+            self._stalled = False
+        return True
+
+    def _wait(self, deadline: float) -> bool:
+        """Wait for the reader to make room for the spill buffer until the deadline.
+
+        :return: True if the spill buffer is empty.
+        """
+        while not self._drain():
+            remaining = deadline - _time.monotonic()
+            if remaining <= 0:
+                return False
+            _select.select((), (self.file_descriptor, ), (), remaining)
+        return True
+
+    def write_bytes(self, data) -> None:  # noqa: ANN001
+        """Write the encoded bytes, or keep them in the spill buffer if the reader is
+        slow; follow the policy if there's no room for them."""
+        size = len(data)
+        if not size:
+            return
+        if self._drain():
+            written = self._write_some(data)
+            if written < size:
+                # The rest of a partly written output must be written, however big it
+                # is, or the reader would get a broken record
+                self._spill += data[written:]
+                self.bytes_delayed += size - written
+            return
+        if len(self._spill) + size <= self.spill_size:
+            self._spill += data
+            self.bytes_delayed += size
+            return
+        if self.policy == 'wait' and not self._stalled:
+            deadline = _time.monotonic() + self.timeout
+            while len(self._spill) + size > self.spill_size:
+                remaining = deadline - _time.monotonic()
+                if remaining <= 0:
+                    self._stalled = True
+                    break
+                _select.select((), (self.file_descriptor, ), (), remaining)
+                self._drain()
+            if len(self._spill) + size <= self.spill_size:
+                self._spill += data
+                self.bytes_delayed += size
+                return
+        elif self.policy == 'divert':
+            if self._divert is None:
+                self._divert = open(self.divert_file, 'ab')  # noqa: SIM115
+            self._divert.write(data)
+            self._divert.flush()
+            self.bytes_diverted += size
+            self.writes_diverted += 1
+            return
+        self.bytes_dropped += size
+        self.writes_dropped += 1
+
+    def flush(self) -> None:
+        """Write the spill buffer, waiting for the reader with the 'wait' policy."""
+        if self.policy == 'wait':
+            self._wait(_time.monotonic() + self.timeout)
+        else:
+            self._drain()
+
+    def close(self) -> None:
+        """Write what the reader takes in time, drop the rest and release the
+        resources."""
+        if not self._wait(_time.monotonic() + self.timeout):
+            self.bytes_dropped += len(self._spill)
+            self.writes_dropped += 1
+            self._spill.clear()
+        if self._divert is not None:
+            self._divert.close()
+            self._divert = None
+        if self.close_file_descriptor:
+            _os.close(self.file_descriptor)
+            self.close_file_descriptor = False
+
+    @property
+    def pending(self) -> int:
+        """The number of bytes in the spill buffer."""
+        return len(self._spill)
+
+    def stats(self) -> _Dict[str, int]:
+        """Return the number of the bytes that have been written, delayed, dropped and
+        diverted.
+
+        :return: A dictionary of the counters, along with the number of the bytes that
+            are waiting in the spill buffer.
+        """
+        return {
+            'bytes_written': self.bytes_written,
+            'bytes_delayed': self.bytes_delayed,
+            'bytes_pending': self.pending,
+            'bytes_dropped': self.bytes_dropped,
+            'writes_dropped': self.writes_dropped,
+            'bytes_diverted': self.bytes_diverted,
+            'writes_diverted': self.writes_diverted
+        }
+
+
+def _may_block(stream) -> bool:  # noqa: ANN001
+    """Whether writing to the stream may wait for a reader (a terminal, a pipe or a
+    socket)."""
+    try:
+        mode = _os.fstat(stream.fileno()).st_mode
+    except (AttributeError, ValueError, OSError):
+        return False
+    return _stat.S_ISCHR(mode) or _stat.S_ISFIFO(mode) or _stat.S_ISSOCK(mode)
+
+
+def open_non_blocking_writer(
+    stream,  # noqa: ANN001
+    **kwargs: _Any
+) -> _Optional[RawWriter]:
+    """Make a NonBlockingWriter for the terminal or the pipe of a text stream.
+
+    Other kinds of files, like regular files, don't make the writer wait for a reader,
+    so they get a RawWriter. A RuntimeWarning is issued when a terminal or a pipe can't
+    be opened again in non-blocking mode (e.g. a pipe on macOS, or Windows), as it is
+    written in blocking mode then.
+
+    :param stream: The stream.
+    :param kwargs: The keyword arguments of NonBlockingWriter.
+    :return: The writer or None if the stream has no file descriptor.
+    """
+    writer = open_raw_writer(stream)
+    file_descriptor = None if writer is None else reopen(stream)
+    if file_descriptor is None:
+        if _may_block(stream):
+            _warnings.warn(
+                'Non-blocking writes are not supported for this stream on this '
+                'platform; it is written in blocking mode',
+                RuntimeWarning,
+                stacklevel=2
+            )
+        return writer
+    return NonBlockingWriter(
+        file_descriptor,
+        writer.encoding,
+        writer.errors,
+        close_file_descriptor=True,
+        **kwargs
+    )
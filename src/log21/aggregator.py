@@ -0,0 +1,264 @@
+# log21.aggregator.py
+# CodeWriter21
+
+# yapf: disable
+
+import logging as _logging
+import multiprocessing as _multiprocessing
+from typing import (Any as _Any, Dict as _Dict, List as _List, Tuple as _Tuple,
+                    Union as _Union, Optional as _Optional)
+from logging import Handler as _Handler, LogRecord as _LogRecord
+
+from log21.levels import NOTSET
+from log21.logger import _loggers, _loggers_lock
+from log21.queue_handler import QueueListener as _QueueListener
+
+# yapf: enable
+
+__all__ = ['LogAggregator', 'ProcessQueueHandler', 'worker_initializer']
+
+# ruff: noqa: ANN001
+
+# Formats the tracebacks of the records before they leave the worker
+_exception_formatter = _logging.Formatter()
+
+# The handler that worker_initializer installed in this process
+_worker_handler: _Optional['ProcessQueueHandler'] = None
+
+
+def _pack(record: _LogRecord) -> tuple:
+    """Turn a record into a tuple of the values the parent process needs.
+
+    The message is merged with its arguments and the traceback is formatted, so
+    nothing that may not be picklable is sent.
+    """
+    exc_text = record.exc_text
+    if record.exc_info and not exc_text:
+        exc_text = _exception_formatter.formatException(record.exc_info)
+    return (
+        record.name, record.levelno, record.pathname, record.lineno,
+        record.getMessage(), exc_text, record.stack_info, record.funcName,
+        record.created, record.msecs, record.process, record.processName, record.thread,
+        record.threadName
+    )
+
+
+def _unpack(data: tuple) -> _LogRecord:
+    """Make a record out of a tuple made by `_pack`."""
+    (
+        name, levelno, pathname, lineno, msg, exc_text, stack_info, func_name, created,
+        msecs, process, process_name, thread, thread_name
+    ) = data
+    record = _LogRecord(
+        name, levelno, pathname, lineno, msg, None, None, func_name, stack_info
+    )
+    record.created = created
+    record.msecs = msecs
+    record.relativeCreated = (created - _logging._startTime) * 1000  # noqa: SLF001
+    record.exc_text = exc_text
+    record.process = process
+    record.processName = process_name
+    record.thread = thread
+    record.threadName = thread_name
+    return record
+
+
+class ProcessQueueHandler(_Handler):
+    """A handler that sends compact copies of the records to a LogAggregator in the
+    parent process.
+
+    Only the standard attributes of the records are sent; the attributes added by
+    `extra` are not.
+    """
+
+    def __init__(self, queue, level: _Union[int, str] = NOTSET) -> None:
+        """Initialize the handler.
+
+        :param queue: The multiprocessing queue of the LogAggregator.
+        :param level: The level of the handler.
+        """
+        super().__init__(level)
+        self.queue = queue
+
+    def _forward(self, record) -> bool:
+        """Check if the record should be sent; a record that propagates to several
+        loggers that use this handler is only sent once."""
+        if getattr(record, '_log21_forwarded', False):
+            return False
+        record._log21_forwarded = True  # noqa: SLF001
+        return True
+
+    def emit(self, record) -> None:
+        """Send the record to the parent process."""
+        try:
+            if self._forward(record):
+                self.queue.put_nowait(_pack(record))
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+    def handle_batch(self, records) -> None:
+        """Send several records to the parent process at once.
+
+        :param records: The records to send.
+        """
+        records = [
+            record for record in records
+            if self.filter(record) and self._forward(record)
+        ]
+        if not records:
+            return
+        try:
+            self.queue.put_nowait([_pack(record) for record in records])
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(records[-1])
+
+
+def _find_logger(name: str) -> _logging.Logger:
+    """Find the logger of the parent process that has the given name."""
+    # avoid circular import; pylint: disable=import-outside-toplevel
+    import log21  # noqa: PLC0415
+
+    logger = log21._manager.getLogger(name)  # noqa: SLF001
+    if logger is not None:
+        return logger
+    if name == log21.root.name:
+        return log21.root
+    return _logging.getLogger(name)
+
+
+class _AggregatorListener(_QueueListener):
+    """Receives the records of the workers and dispatches them."""
+
+    def prepare(self, record) -> _LogRecord:
+        return _unpack(record)
+
+    def _take(self) -> _List[_Any]:
+        items = []
+        # The workers send lists of records for their batches
+        for item in super()._take():
+            if isinstance(item, list):
+                items.extend(item)
+            else:
+                items.append(item)
+        return items
+
+    def handle_batch(self, records: _List[_LogRecord]) -> None:
+        if self.handlers:
+            super().handle_batch(records)
+            return
+        loggers: _Dict[str, _logging.Logger] = {}
+        for record in records:
+            logger = loggers.get(record.name)
+            if logger is None:
+                logger = loggers[record.name] = _find_logger(record.name)
+            logger.handle(record)
+
+
+def worker_initializer(queue, level: _Union[int, str] = NOTSET) -> None:
+    """Make the loggers of a worker process send their records to a LogAggregator.
+
+    Every logger that has handlers, and the root loggers, get a ProcessQueueHandler
+    instead of their handlers, and `log21.get_logger` uses it for the loggers that are
+    made afterward. It works with the fork and the spawn start methods; pass it as the
+    `initializer` of a `multiprocessing.Pool` or a `ProcessPoolExecutor`, or call it
+    at the start of the target of a `multiprocessing.Process`.
+
+    :param queue: The queue of the LogAggregator.
+    :param level: The level of the ProcessQueueHandler.
+    """
+    global _worker_handler  # pylint: disable=global-statement
+    # avoid circular import; pylint: disable=import-outside-toplevel
+    import log21  # noqa: PLC0415
+
+    handler = _worker_handler = ProcessQueueHandler(queue, level)
+    with _loggers_lock:
+        loggers = list(_loggers)
+    loggers += [
+        logger for logger in _logging.Logger.manager.loggerDict.values()
+        if isinstance(logger, _logging.Logger)
+    ]
+    roots = [_logging.root, log21.root]
+    for logger in {id(logger): logger for logger in loggers + roots}.values():
+        if not logger.handlers and logger not in roots:
+            continue
+        # The handlers are copies of the parent's handlers, closing them might write
+        # their buffers once more
+        for old_handler in logger.handlers[:]:
+            logger.removeHandler(old_handler)
+        logger.addHandler(handler)
+
+
+def worker_handler() -> _Optional[ProcessQueueHandler]:
+    """Return the ProcessQueueHandler of this process if it is a worker of a
+    LogAggregator."""
+    return _worker_handler
+
+
+class LogAggregator:
+    """Collects the records of worker processes and handles them in this process.
+
+    The workers send compact copies of their records through a multiprocessing queue
+    and a thread of this process passes them to the given handlers, or to the handlers
+    of the loggers with the same names in this process when no handler is given, so
+    only this process writes to the terminal and the files.
+
+    >>> import log21
+    >>> from concurrent.futures import ProcessPoolExecutor
+    >>> from log21.aggregator import LogAggregator
+    >>>
+    >>> logger = log21.get_logger('Pipeline', file='pipeline.log')
+    >>>
+    >>> def work(number):
+    ...     logger.info('Working on', number)
+    ...
+    >>> if __name__ == '__main__':
+    ...     with LogAggregator() as aggregator:
+    ...         with ProcessPoolExecutor(32, **aggregator.worker_options()) as pool:
+    ...             list(pool.map(work, range(100)))
+    """
+
+    def __init__(
+        self,
+        *handlers: _Handler,
+        context: _Optional[_Union[str, _Any]] = None,
+        batch_size: int = 256
+    ) -> None:
+        """Initialize the aggregator.
+
+        :param handlers: The handlers that handle every record of the workers. If no
+            handler is given, the records are handled by the loggers of this process.
+        :param context: The multiprocessing context, or the name of its start method,
+            that the workers are made with.
+        :param batch_size: The maximum number of records to handle at once.
+        """
+        if context is None or isinstance(context, str):
+            context = _multiprocessing.get_context(context)
+        self.queue = context.Queue()
+        self.listener = _AggregatorListener(
+            self.queue, *handlers, batch_size=batch_size
+        )
+
+    def start(self) -> 'LogAggregator':
+        """Start handling the records of the workers."""
+        self.listener.start()
+        return self
+
+    def stop(self) -> None:
+        """Handle the records that have been received and stop."""
+        self.listener.stop()
+
+    def __enter__(self) -> 'LogAggregator':
+        return self.start()
+
+    def __exit__(self, *_) -> None:
+        self.stop()
+
+    def worker_options(self, level: _Union[int, str] = NOTSET) -> _Dict[str, _Any]:
+        """Return the keyword arguments that set up the workers of a
+        `multiprocessing.Pool` or a `ProcessPoolExecutor`.
+
+        :param level: The level of the ProcessQueueHandler of the workers.
+        :return: A dictionary with `initializer` and `initargs`.
+        """
+        initargs: _Tuple[_Any, ...] = (self.queue, level)
+        return {'initializer': worker_initializer, 'initargs': initargs}
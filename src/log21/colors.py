@@ -1,20 +1,22 @@
 # log21.colors.py
 # CodeWriter21
 
+import os as _os
 import re as _re
 from typing import Union as _Union, Sequence as _Sequence
+from weakref import WeakKeyDictionary as _WeakKeyDictionary
 
 import webcolors as _webcolors
 
 __all__ = [
     'Colors', 'get_color', 'get_colors', 'ansi_escape', 'get_color_name',
-    'closest_color', 'hex_escape', 'RESET', 'BLACK', 'RED', 'GREEN', 'YELLOW', 'BLUE',
-    'MAGENTA', 'CYAN', 'WHITE', 'BACK_BLACK', 'BACK_RED', 'BACK_GREEN', 'BACK_YELLOW',
-    'BACK_BLUE', 'BACK_MAGENTA', 'BACK_CYAN', 'BACK_WHITE', 'GREY', 'LIGHT_RED',
-    'LIGHT_GREEN', 'LIGHT_YELLOW', 'LIGHT_BLUE', 'LIGHT_MAGENTA', 'LIGHT_CYAN',
-    'LIGHT_WHITE', 'BACK_GREY', 'BACK_LIGHT_RED', 'BACK_LIGHT_GREEN',
-    'BACK_LIGHT_YELLOW', 'BACK_LIGHT_BLUE', 'BACK_LIGHT_MAGENTA', 'BACK_LIGHT_CYAN',
-    'BACK_LIGHT_WHITE'
+    'closest_color', 'hex_escape', 'supports_color', 'strip_escapes', 'RESET', 'BLACK',
+    'RED', 'GREEN', 'YELLOW', 'BLUE', 'MAGENTA', 'CYAN', 'WHITE', 'BACK_BLACK',
+    'BACK_RED', 'BACK_GREEN', 'BACK_YELLOW', 'BACK_BLUE', 'BACK_MAGENTA', 'BACK_CYAN',
+    'BACK_WHITE', 'GREY', 'LIGHT_RED', 'LIGHT_GREEN', 'LIGHT_YELLOW', 'LIGHT_BLUE',
+    'LIGHT_MAGENTA', 'LIGHT_CYAN', 'LIGHT_WHITE', 'BACK_GREY', 'BACK_LIGHT_RED',
+    'BACK_LIGHT_GREEN', 'BACK_LIGHT_YELLOW', 'BACK_LIGHT_BLUE', 'BACK_LIGHT_MAGENTA',
+    'BACK_LIGHT_CYAN', 'BACK_LIGHT_WHITE'
 ]
 
 # Regex pattern to find ansi colors in message
@@ -356,3 +358,85 @@ def get_colors(*colors: str, raise_exceptions: bool = False) -> str:
         output = output[:-1] + 'm'
         return output
     return ''
+
+
+# The results of supports_color for the streams it has checked
+_color_support: '_WeakKeyDictionary[object, bool]' = _WeakKeyDictionary()
+
+
+def _detect_color_support(stream) -> bool:  # noqa: ANN001
+    force_color = _os.environ.get('FORCE_COLOR')
+    if force_color is not None:
+        return force_color.lower() not in ('0', 'false')
+    if _os.environ.get('NO_COLOR'):
+        return False
+    if _os.environ.get('TERM') == 'dumb':
+        return False
+    try:
+        return bool(stream.isatty())
+    except (AttributeError, ValueError, OSError):
+        return False
+
+
+def supports_color(stream) -> bool:  # noqa: ANN001
+    """Checks if the colors written to the stream will be seen as colors.
+
+    FORCE_COLOR (unless it is '0' or 'false') turns the colors on, a non-empty
+    NO_COLOR or TERM=dumb turns them off and otherwise only terminals get colors. The
+    result is cached for each stream.
+
+    >>>
+    >>> import sys
+    >>> supports_color(sys.stdout)
+    True
+    >>> import io
+    >>> supports_color(io.StringIO())
+    False
+    >>>
+
+    :param stream: The stream to check.
+    :return: bool: True if the stream should be colorized.
+    """
+    try:
+        return _color_support[stream]
+    except KeyError:
+        pass
+    except TypeError:
+        # The stream can't be weakly referenced, so it is not cached
+        return _detect_color_support(stream)
+    result = _color_support[stream] = _detect_color_support(stream)
+    return result
+
+
+# Every escape sequence that strip_escapes removes: CSI sequences (SGR colors, cursor
+# movements, etc.) and log21's hex colors, in one pattern so that a single pass finds
+# them all
+_ESCAPE_SEQUENCE = r'\x1b(?:\[[0-?]*[ -/]*[@-~]|#[0-9a-fA-F]{6}h[fb|])'
+_escape_sequence = _re.compile(_ESCAPE_SEQUENCE)
+_escape_sequence_bytes = _re.compile(_ESCAPE_SEQUENCE.encode())
+
+
+def strip_escapes(text: _Union[str, bytes]) -> _Union[str, bytes]:
+    """Remove the ANSI escape sequences (SGR colors and the other CSI sequences) and
+    log21's hex colors from a text.
+
+    Texts without an ESC character, which are most of them, are returned as they are
+    without being scanned by the regular expression.
+
+    >>>
+    >>> strip_escapes('\x1b[91mRed\x1b[0m and \x1b#00ff00hfGreen')
+    'Red and Green'
+    >>> strip_escapes(b'\x1b[2K\x1b[1;32mDone\x1b[0m')
+    b'Done'
+    >>>
+
+    :param text: str or bytes: The text.
+    :return: The text without the escape sequences, of the same type.
+    """
+    if isinstance(text, str):
+        if '\x1b' not in text:
+            return text
+        return _escape_sequence.sub('', text)
+    if b'\x1b' not in text:
+        return text
+    return _escape_sequence_bytes.sub(b'', text)
@@ -0,0 +1,136 @@
+# log21.decode.py
+# CodeWriter21
+"""Render the binary logs of BinaryFileHandler as text.
+
+    python -m log21.decode app.log21
+    python -m log21.decode app.log21 --fmt '%(asctime)s %(name)s %(message)s' --plain
+"""
+
+# yapf: disable
+
+import os as _os
+import sys as _sys
+import logging as _logging
+from typing import (IO as _IO, Any as _Any, Dict as _Dict, List as _List,
+                    Iterator as _Iterator, Optional as _Optional)
+
+from log21.colors import supports_color as _supports_color
+from log21.argparse import ColorizingArgumentParser as _ColorizingArgumentParser
+from log21.formatters import ColorizingFormatter as _ColorizingFormatter
+from log21._binary_format import read_records
+
+# yapf: enable
+
+__all__ = ['make_record', 'decode', 'main']
+
+
+def make_record(attributes: _Dict[str, _Any]) -> _logging.LogRecord:
+    """Make a LogRecord from the attributes of a record of a binary log.
+
+    :param attributes: The attributes that `read_records` returns.
+    :return: The LogRecord.
+    """
+    record = _logging.makeLogRecord(attributes)
+    created = record.created
+    record.msecs = (created - int(created)) * 1000
+    record.relativeCreated = (created - _logging._startTime) * 1000  # noqa: SLF001
+    try:
+        record.filename = _os.path.basename(record.pathname)
+        record.module = _os.path.splitext(record.filename)[0]
+    except (TypeError, ValueError, AttributeError):
+        record.filename = record.pathname
+        record.module = 'Unknown module'
+    return record
+
+
+def decode(file: _IO[bytes], formatter: _logging.Formatter) -> _Iterator[str]:
+    """Render the records of a binary log.
+
+    The level names that the formatter doesn't know are taken from the file.
+
+    :param file: The file, opened in binary mode.
+    :param formatter: The formatter to render the records with.
+    :return: An iterator of the rendered records, each ending with a new line.
+    """
+    level_names = getattr(formatter, 'level_names', None)
+    for attributes in read_records(file):
+        record = make_record(attributes)
+        if level_names is not None and record.levelno not in level_names:
+            level_names[record.levelno] = record.levelname
+        try:
+            text = formatter.format(record)
+        except Exception as error:  # pylint: disable=broad-except
+            # The message doesn't go with its arguments; both are shown as they are
+            record.msg = (
+                f'{str(record.msg).rstrip()} [arguments: {record.args!r}; '
+                f'{type(error).__name__}: {error}]\n'
+            )
+            record.args = ()
+            text = formatter.format(record)
+        yield text if text.endswith('\n') else text + '\n'
+
+
+def main(argv: _Optional[_List[str]] = None) -> int:
+    """Run the decoder.
+
+    :param argv: The command line arguments; defaults to `sys.argv[1:]`.
+    :return: The exit status.
+    """
+    parser = _ColorizingArgumentParser(
+        prog='python -m log21.decode',
+        description='Renders the binary logs of log21.BinaryFileHandler as text.'
+    )
+    parser.add_argument('files', nargs='+', help='The binary log files.')
+    parser.add_argument(
+        '-f',
+        '--fmt',
+        default='[%(asctime)s] [%(levelname)s] %(message)s',
+        help='The format of the records, like the `fmt` of get_logger.'
+    )
+    parser.add_argument(
+        '-d', '--datefmt', default='%H:%M:%S', help='The format of the time.'
+    )
+    parser.add_argument(
+        '-s',
+        '--style',
+        choices=('%', '{', '$'),
+        default='%',
+        help='The style of the format.'
+    )
+    colors = parser.add_mutually_exclusive_group()
+    colors.add_argument(
+        '--colors',
+        action='store_true',
+        default=None,
+        help='Colorize the output; the default when it goes to a terminal.'
+    )
+    colors.add_argument(
+        '--plain', dest='colors', action='store_false', help='Write plain text.'
+    )
+    args = parser.parse_args(argv)
+
+    formatter = _ColorizingFormatter(args.fmt, args.datefmt, style=args.style)
+    if args.colors is None:
+        args.colors = _supports_color(_sys.stdout)
+    if not args.colors:
+        formatter = formatter.plain_formatter()
+
+    status = 0
+    for path in args.files:
+        try:
+            with open(path, 'rb') as file:
+                for text in decode(file, formatter):
+                    _sys.stdout.write(text)
+        except BrokenPipeError:
+            # The reader (e.g. `head`) is gone; the output that is left is thrown away
+            _os.dup2(_os.open(_os.devnull, _os.O_WRONLY), _sys.stdout.fileno())
+            return status
+        except (OSError, ValueError) as error:
+            _sys.stderr.write(f'{path}: {error}\n')
+            status = 1
+    _sys.stdout.flush()
+    return status
+
+
+if __name__ == '__main__':
+    _sys.exit(main())
@@ -1,10 +1,36 @@
 # log21.file_handler.py
 # CodeWriter21
 
-from typing import Optional as _Optional
+# yapf: disable
+
+import os as _os
+import re as _re
+import sys as _sys
+import time as _time
+import shutil as _shutil
+import zlib as _zlib
+import asyncio as _asyncio
+import threading as _threading
+import logging as _logging
+import calendar as _calendar
+import importlib as _importlib
+import traceback as _traceback
+from typing import (Dict as _Dict, List as _List, Union as _Union, Literal as _Literal,
+                    Callable as _Callable, Optional as _Optional)
 from logging import FileHandler as _FileHandler
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
 
+from log21.colors import strip_escapes as _strip_escapes
+from log21.levels import ERROR
+from log21.logger import LazyMessage as _LazyMessage
+from log21._raw_io import RawWriter as _RawWriter, open_raw_writer as _open_raw_writer
+from log21._flusher import PeriodicFlusher as _PeriodicFlusher
 from log21.formatters import DecolorizingFormatter as _DecolorizingFormatter
+from log21.helper_types import FileSize as _FileSize
+from log21._binary_format import (JOINED as _JOINED, NO_TEMPLATE as _NO_TEMPLATE,
+                                  Writer as _BinaryWriter)
+
+# yapf: enable
 
 # ruff: noqa: ANN001
 
@@ -42,18 +68,1071 @@ class FileHandler(_FileHandler):
 
 class DecolorizingFileHandler(FileHandler):
     """A subclass of FileHandler that removes ANSI colors from the log messages before
-    writing them to the file."""
+    writing them to the file.
+
+    With `raw=True` the records are encoded and written straight to the file descriptor
+    of the file with `os.write` (except on Windows).
+    """
     terminator = ''
 
+    def __init__(self, *args, raw: bool = False, **kwargs) -> None:
+        """Initialize the handler.
+
+        :param args: The arguments of FileHandler.
+        :param raw: Whether to write to the file descriptor of the file directly.
+        :param kwargs: The keyword arguments of FileHandler.
+        """
+        self.raw = raw
+        self._raw_stream = None
+        self._raw_writer: _Optional[_RawWriter] = None
+        super().__init__(*args, **kwargs)
+
+    def _get_raw_writer(self) -> _Optional[_RawWriter]:
+        """Return the RawWriter of the file in the raw mode, or None."""
+        if not self.raw:
+            return None
+        stream = self.stream
+        if stream is not self._raw_stream:
+            self._raw_writer = _open_raw_writer(stream)
+            self._raw_stream = stream
+        return self._raw_writer
+
+    def _reopen(self) -> None:
+        """Open the file again, appending to it, e.g. after a failed rollover; the
+        lock of the handler must be held."""
+        if self.stream is not None:
+            return
+        mode = self.mode
+        self.mode = mode.replace('w', 'a')
+        try:
+            self.stream = self._open()
+        finally:
+            self.mode = mode
+
+    def _format_plain(self, record) -> str:
+        """Format the record and remove the colors that the formatter left."""
+        msg = self.format(record)
+        if isinstance(self.formatter, _DecolorizingFormatter):
+            # It has already removed them
+            return msg
+        return _strip_escapes(msg)
+
     def emit(self, record) -> None:
         """Emit a record."""
         if self.stream is None:
             self.stream = self._open()
         try:
-            msg = self.format(record)
-            msg = _DecolorizingFormatter.decolorize(msg)
-            stream = self.stream
-            stream.write(msg + self.terminator)
+            self._write_chunks([self._format_plain(record) + self.terminator])
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+    def _write_chunks(self, chunks: _List[str]) -> None:
+        """Write the formatted records; the lock of the handler must be held.
+
+        :param chunks: The formatted records, with their terminators.
+        """
+        writer = self._get_raw_writer()
+        if writer is not None:
+            if len(chunks) == 1:
+                writer.write(chunks[0])
+            else:
+                writer.write_many(chunks)
+            return
+        self.stream.write(''.join(chunks))
+        self.flush()
+
+    def handle_batch(self, records) -> None:
+        """Handle several records with one acquisition of the lock and one write.
+
+        :param records: The records to handle.
+        """
+        records = [record for record in records if self.filter(record)]
+        if not records:
+            return
+        self.acquire()
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            chunks = []
+            for record in records:
+                try:
+                    chunks.append(self._format_plain(record) + self.terminator)
+                except Exception:  # pylint: disable=broad-except
+                    self.handleError(record)
+            if chunks:
+                try:
+                    self._write_chunks(chunks)
+                except Exception:  # pylint: disable=broad-except
+                    self.handleError(records[-1])
+        finally:
+            self.release()
+
+
+class RotatingFileHandler(DecolorizingFileHandler):
+    """A DecolorizingFileHandler that starts a new file when the file reaches a size.
+
+    The size of the file is counted as the records are written, so the file is not
+    checked for every record. When the next record doesn't fit, `filename` is renamed
+    to `filename.1`, `filename.1` to `filename.2` and so on, up to `backup_count`
+    backups; the oldest backup is replaced. With no backups the file is emptied.
+
+    >>> import log21
+    >>>
+    >>> logger = log21.Logger('Server')
+    >>> logger.addHandler(log21.RotatingFileHandler(
+    ...     'server.log', max_bytes='512MiB', backup_count=3))
+    """
+
+    def __init__(
+        self,
+        filename,
+        mode: str = 'a',
+        max_bytes: _Union[_FileSize, str, int] = 0,
+        backup_count: int = 0,
+        encoding: _Optional[str] = None,
+        delay: bool = False,
+        errors=None,
+        formatter=None,
+        level=None,
+        raw: bool = False
+    ) -> None:
+        """Initialize the handler.
+
+        :param filename: The filename of the log file.
+        :param mode: The mode to open the file in.
+        :param max_bytes: The maximum size of the file: a FileSize, a string like
+            "512MiB" or a number of bytes. 0 means no limit.
+        :param backup_count: The number of the old files to keep.
+        :param encoding: The encoding to use when opening the file.
+        :param delay: Whether to delay opening the file.
+        :param errors: The error handling scheme to use.
+        :param formatter: The formatter to use.
+        :param level: The level to use.
+        :param raw: Whether to write to the file descriptor of the file directly.
+        """
+        if isinstance(max_bytes, str):
+            max_bytes = _FileSize(max_bytes)
+        self.max_bytes = int(max_bytes)
+        self.backup_count = backup_count
+        # The size of the file and the encoding it is written with
+        self._size = 0
+        self._encoding = 'utf-8'
+        self._errors = 'strict'
+        super().__init__(
+            filename,
+            mode,
+            encoding,
+            delay,
+            errors,
+            formatter=formatter,
+            level=level,
+            raw=raw
+        )
+
+    def _open(self):  # noqa: ANN202
+        stream = super()._open()
+        self._size = _os.fstat(stream.fileno()).st_size
+        self._encoding = stream.encoding
+        self._errors = stream.errors
+        return stream
+
+    def _chunk_size(self, chunk: str) -> int:
+        """Return the number of bytes that a formatted record takes in the file."""
+        if chunk.isascii():
+            size = len(chunk)
+        else:
+            size = len(chunk.encode(self._encoding, self._errors))
+        if _os.linesep != '\n' and not self.raw:
+            # The text layer translates the new lines
+            size += chunk.count('\n') * (len(_os.linesep) - 1)
+        return size
+
+    def _write_chunks(self, chunks: _List[str]) -> None:
+        if self.max_bytes <= 0:
+            super()._write_chunks(chunks)
+            return
+        start = 0
+        for index, chunk in enumerate(chunks):
+            size = self._chunk_size(chunk)
+            # A record that is bigger than the limit gets a file of its own
+            if self._size and self._size + size > self.max_bytes:
+                if index > start:
+                    super()._write_chunks(chunks[start:index])
+                self._rollover()
+                start = index
+            self._size += size
+        super()._write_chunks(chunks[start:])
+
+    def backup_name(self, number: int) -> str:
+        """Return the name of a backup of the file.
+
+        :param number: The number of the backup, 1 being the newest.
+        :return: The path of the backup.
+        """
+        return f'{self.baseFilename}.{number}'
+
+    def _rollover(self) -> None:
+        """Start a new file. If that fails, the records go on to the current file and
+        the next try waits for another `max_bytes`."""
+        try:
+            self.do_rollover()
+        except OSError:
+            if _logging.raiseExceptions:
+                _traceback.print_exc(file=_sys.stderr)
+            self._reopen()
+            self._size = 0
+
+    def do_rollover(self) -> None:
+        """Rename the file and its backups and start a new file; the lock of the
+        handler must be held."""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        if self.backup_count > 0:
+            for number in range(self.backup_count - 1, 0, -1):
+                source = self.backup_name(number)
+                if _os.path.exists(source):
+                    _os.replace(source, self.backup_name(number + 1))
+            if _os.path.exists(self.baseFilename):
+                _os.replace(self.baseFilename, self.backup_name(1))
+        elif _os.path.exists(self.baseFilename):
+            _os.truncate(self.baseFilename, 0)
+        self.stream = self._open()
+
+
+# The number of seconds of the units of TimedRotatingFileHandler, and the suffixes of
+# the names of the closed files
+_UNITS = {
+    'S': (1, '%Y-%m-%d_%H-%M-%S'),
+    'M': (60, '%Y-%m-%d_%H-%M'),
+    'H': (60 * 60, '%Y-%m-%d_%H'),
+    'D': (24 * 60 * 60, '%Y-%m-%d')
+}
+# The modules that compress the closed files and their extensions
+_COMPRESSORS = {'gzip': '.gz', 'bz2': '.bz2', 'lzma': '.xz'}
+
+
+class TimedRotatingFileHandler(DecolorizingFileHandler):
+    """A DecolorizingFileHandler that starts a new file at intervals.
+
+    The time of the next rollover is worked out when a file is started, so each record
+    is only compared with it. The closed file is renamed to `filename.<its start
+    time>` and, if `compress` is set, compressed in a background thread of the handler
+    along with the removal of the backups beyond `backup_count`, so the logging thread
+    never waits for them.
+
+    `when` is one of 'S', 'M', 'H', 'D' (or 'midnight'), the rollovers are at the
+    multiples of `interval` of the unit since midnight; or a callable that takes the
+    current time and returns the time of the next rollover, e.g. for cron-like
+    schedules.
+
+    >>> import log21
+    >>>
+    >>> logger = log21.Logger('Server')
+    >>> logger.addHandler(log21.TimedRotatingFileHandler(
+    ...     'server.log', when='H', backup_count=48, compress='gzip'))
+    """
+
+    def __init__(
+        self,
+        filename,
+        when: _Union[str, _Callable[[float], float]] = 'D',
+        interval: int = 1,
+        backup_count: int = 0,
+        compress: _Optional[_Literal['gzip', 'bz2', 'lzma']] = None,
+        utc: bool = False,
+        mode: str = 'a',
+        encoding: _Optional[str] = None,
+        delay: bool = False,
+        errors=None,
+        formatter=None,
+        level=None,
+        raw: bool = False
+    ) -> None:
+        """Initialize the handler.
+
+        :param filename: The filename of the log file.
+        :param when: The unit of the interval: 'S', 'M', 'H', 'D' or 'midnight', or a
+            callable that returns the time of the next rollover for a time.
+        :param interval: The number of units between the rollovers.
+        :param backup_count: The number of the closed files to keep. 0 keeps them all.
+        :param compress: The compression of the closed files: 'gzip', 'bz2', 'lzma' or
+            None.
+        :param utc: Whether to use UTC instead of the local time.
+        :param mode: The mode to open the file in.
+        :param encoding: The encoding to use when opening the file.
+        :param delay: Whether to delay opening the file.
+        :param errors: The error handling scheme to use.
+        :param formatter: The formatter to use.
+        :param level: The level to use.
+        :param raw: Whether to write to the file descriptor of the file directly.
+        """
+        if callable(when):
+            self.suffix = _UNITS['S'][1]
+        else:
+            when = when.upper()
+            if when == 'MIDNIGHT':
+                when = 'D'
+            if when not in _UNITS:
+                raise ValueError(
+                    "`when` must be a callable or one of: 'S', 'M', 'H', 'D', "
+                    "'midnight'"
+                )
+            if interval < 1:
+                raise ValueError('`interval` must be at least 1')
+            self.suffix = _UNITS[when][1]
+        if compress is not None and compress not in _COMPRESSORS:
+            raise ValueError("`compress` must be one of: 'gzip', 'bz2', 'lzma', None")
+        self.when = when
+        self.interval = interval
+        self.backup_count = backup_count
+        self.compress = compress
+        self.utc = utc
+        self._executor: _Optional[_ThreadPoolExecutor] = None
+        super().__init__(
+            filename,
+            mode,
+            encoding,
+            delay,
+            errors,
+            formatter=formatter,
+            level=level,
+            raw=raw
+        )
+        try:
+            self._segment_start = _os.path.getmtime(self.baseFilename)
+        except OSError:
+            self._segment_start = _time.time()
+        self.rollover_at = self.next_rollover(self._segment_start)
+        # The closed files look like `<filename>.<time>[.<extension>]`
+        self._closed_file = _re.compile(
+            _re.escape(_os.path.basename(self.baseFilename)) +
+            r'\.\d{4}-\d{2}-\d{2}(?:_\d{2}(?:-\d{2}){0,2})?(?:\.\d+)?'
+            r'(?:\.gz|\.bz2|\.xz)?$'
+        )
+
+    def next_rollover(self, current_time: float) -> float:
+        """Work out the time of the rollover that follows the given time.
+
+        :param current_time: The time, in seconds since the epoch.
+        :return: The time of the next rollover.
+        """
+        if callable(self.when):
+            return self.when(current_time)
+        if self.utc:
+            time_tuple = _time.gmtime(current_time)
+            midnight = _calendar.timegm(time_tuple[:3] + (0, 0, 0))
+        else:
+            time_tuple = _time.localtime(current_time)
+            midnight = _time.mktime(time_tuple[:3] + (0, 0, 0, 0, 0, -1))
+        unit = _UNITS[self.when][0]
+        if self.when == 'D':
+            # Days are counted by the calendar, so that DST changes don't shift them
+            year, month, day = time_tuple[:3]
+            next_day = (year, month, day + self.interval, 0, 0, 0)
+            if self.utc:
+                return _calendar.timegm(next_day)
+            return _time.mktime(next_day + (0, 0, -1))
+        step = unit * self.interval
+        return midnight + ((current_time - midnight) // step + 1) * step
+
+    def _closed_name(self) -> str:
+        """Return the name of the file that is being closed."""
+        convert = _time.gmtime if self.utc else _time.localtime
+        name = f'{self.baseFilename}.' + _time.strftime(
+            self.suffix, convert(self._segment_start)
+        )
+        number = 1
+        candidate = name
+        # Don't replace a file of the same time (e.g. after the clock was set back)
+        while _os.path.exists(candidate) or (
+            self.compress and
+            _os.path.exists(candidate + _COMPRESSORS[self.compress])
+        ):
+            candidate = f'{name}.{number}'
+            number += 1
+        return candidate
+
+    def do_rollover(self, current_time: _Optional[float] = None) -> None:
+        """Close the file, rename it and start a new one; the compression and the
+        removal of the old files are left to the thread of the handler. The lock of
+        the handler must be held.
+
+        :param current_time: The time that the new file starts at. None means now.
+        """
+        if current_time is None:
+            current_time = _time.time()
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        # Even if the file can't be renamed, the records don't try it again before the
+        # next rollover; they go on to the current file
+        self.rollover_at = self.next_rollover(current_time)
+        closed = None
+        if _os.path.exists(self.baseFilename):
+            closed = self._closed_name()
+            try:
+                _os.replace(self.baseFilename, closed)
+            except OSError:
+                self._reopen()
+                raise
+        self._segment_start = current_time
+        if not self.delay:
+            self.stream = self._open()
+        if closed is not None and (self.compress or self.backup_count > 0):
+            if self._executor is None:
+                self._executor = _ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix='log21-rotate'
+                )
+            self._executor.submit(self._finish, closed)
+
+    def _finish(self, closed: str) -> None:
+        """Compress a closed file and remove the old ones, in the thread of the
+        handler."""
+        try:
+            if self.compress:
+                compressor = _importlib.import_module(self.compress)
+                target = closed + _COMPRESSORS[self.compress]
+                partial = target + '.part'
+                with open(closed, 'rb') as source, \
+                        compressor.open(partial, 'wb') as destination:
+                    _shutil.copyfileobj(source, destination, 1024 * 1024)
+                _os.replace(partial, target)
+                _os.remove(closed)
+            if self.backup_count > 0:
+                self._remove_old_files()
+        except Exception:  # pylint: disable=broad-except
+            if _logging.raiseExceptions:
+                _traceback.print_exc(file=_sys.stderr)
+
+    def _remove_old_files(self) -> None:
+        """Remove the closed files beyond `backup_count`, the oldest first."""
+        directory = _os.path.dirname(self.baseFilename)
+        names = sorted(
+            name for name in _os.listdir(directory) if self._closed_file.match(name)
+        )
+        for name in names[:max(len(names) - self.backup_count, 0)]:
+            try:
+                _os.remove(_os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+
+    def emit(self, record) -> None:
+        """Emit a record, starting a new file first if it is time."""
+        if record.created >= self.rollover_at:
+            try:
+                self.do_rollover(record.created)
+            except Exception:  # pylint: disable=broad-except
+                self.handleError(record)
+        super().emit(record)
+
+    def handle_batch(self, records) -> None:
+        """Handle several records, starting new files where they are due.
+
+        :param records: The records to handle.
+        """
+        start = 0
+        for index, record in enumerate(records):
+            if record.created >= self.rollover_at:
+                if index > start:
+                    super().handle_batch(records[start:index])
+                start = index
+                self.acquire()
+                try:
+                    if record.created >= self.rollover_at:
+                        self.do_rollover(record.created)
+                except Exception:  # pylint: disable=broad-except
+                    self.handleError(record)
+                finally:
+                    self.release()
+        super().handle_batch(records[start:])
+
+    def close(self) -> None:
+        """Wait for the closed files to be compressed and close the file."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        super().close()
+
+
+class GroupCommitFileHandler(DecolorizingFileHandler):
+    # pylint: disable=too-many-instance-attributes
+    """A DecolorizingFileHandler that writes the records of concurrent threads
+    together.
+
+    The records are formatted by the threads that log them, outside the lock of the
+    handler. The first thread that finds no write in progress becomes the leader: it
+    writes every record that has gathered with one call, applies the durability policy
+    once for all of them and passes the leadership on. The other threads wait until
+    their records have been written, so a record is in the file (as durably as the
+    policy promises) when the logging call returns.
+
+    * `durability='none'` leaves the records in the buffer of the file.
+    * `durability='flush'` flushes the file after each batch.
+    * `durability='fsync-interval'` flushes after each batch and syncs the file to the
+      disk at most every `fsync_interval` milliseconds, including after the last batch.
+    * `durability='fsync-level'` flushes after each batch and syncs the batches that
+      contain a record of `fsync_level` or higher.
+
+    >>> import log21
+    >>>
+    >>> logger = log21.Logger('Payments')
+    >>> logger.addHandler(log21.GroupCommitFileHandler(
+    ...     'payments.log', durability='fsync-level'))
+    """
+
+    def __init__(
+        self,
+        filename,
+        mode: str = 'a',
+        durability: _Literal['none', 'flush', 'fsync-interval',
+                             'fsync-level'] = 'flush',
+        fsync_interval: float = 1000,
+        fsync_level: int = ERROR,
+        encoding: _Optional[str] = None,
+        delay: bool = False,
+        errors=None,
+        formatter=None,
+        level=None,
+        raw: bool = False
+    ) -> None:
+        """Initialize the handler.
+
+        :param filename: The filename of the log file.
+        :param mode: The mode to open the file in.
+        :param durability: When the records reach the file or the disk: 'none',
+            'flush', 'fsync-interval' or 'fsync-level'.
+        :param fsync_interval: The minimum number of milliseconds between the syncs
+            with the 'fsync-interval' durability.
+        :param fsync_level: The lowest level of the records that make their batch sync
+            with the 'fsync-level' durability.
+        :param encoding: The encoding to use when opening the file.
+        :param delay: Whether to delay opening the file.
+        :param errors: The error handling scheme to use.
+        :param formatter: The formatter to use.
+        :param level: The level to use.
+        :param raw: Whether to write to the file descriptor of the file directly.
+        """
+        if durability not in ('none', 'flush', 'fsync-interval', 'fsync-level'):
+            raise ValueError(
+                "`durability` must be one of: 'none', 'flush', 'fsync-interval', "
+                "'fsync-level'"
+            )
+        self.durability = durability
+        self.fsync_interval = fsync_interval
+        self.fsync_level = fsync_level
+        # Guards the records that wait for a leader and the state of the commits
+        self._commit_lock = _threading.Lock()
+        self._committed = _threading.Condition(self._commit_lock)
+        self._pending: _List[str] = []
+        self._pending_level = 0
+        self._sequence = 0
+        self._committed_sequence = 0
+        self._leader = False
+        self._last_sync = 0.0
+        self._unsynced = False
+        self._syncer = _PeriodicFlusher(
+            self._timed_sync, fsync_interval / 1000, name='log21-sync'
+        )
+        self.batches = 0
+        self.records = 0
+        self.max_batch_size = 0
+        self.fsyncs = 0
+        self.commit_time = 0.0
+        self.max_commit_time = 0.0
+        super().__init__(
+            filename,
+            mode,
+            encoding,
+            delay,
+            errors,
+            formatter=formatter,
+            level=level,
+            raw=raw
+        )
+
+    def handle(self, record) -> bool:
+        """Format the record in this thread and commit it with the records of the
+        other threads.
+
+        :param record: The record to handle.
+        :return: Whether the record passed the filters.
+        """
+        result = self.filter(record)
+        if isinstance(result, _logging.LogRecord):
+            record = result
+        if result:
+            self.emit(record)
+        return bool(result)
+
+    def emit(self, record) -> None:
+        try:
+            text = self._format_plain(record) + self.terminator
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+            return
+        self._commit([text], record.levelno, record)
+
+    def handle_batch(self, records) -> None:
+        """Commit several records at once.
+
+        :param records: The records to handle.
+        """
+        texts = []
+        level = 0
+        for record in records:
+            if not self.filter(record):
+                continue
+            try:
+                texts.append(self._format_plain(record) + self.terminator)
+            except Exception:  # pylint: disable=broad-except
+                self.handleError(record)
+                continue
+            level = max(level, record.levelno)
+            last_record = record
+        if texts:
+            self._commit(texts, level, last_record)
+
+    def _commit(self, texts: _List[str], level: int, record) -> None:
+        """Add the texts to the next batch and wait until they are written, writing
+        the batch if no other thread is doing it."""
+        with self._commit_lock:
+            self._pending.extend(texts)
+            self._pending_level = max(self._pending_level, level)
+            self._sequence += 1
+            sequence = self._sequence
+            while self._leader:
+                if self._committed_sequence >= sequence:
+                    return
+                self._committed.wait()
+            if self._committed_sequence >= sequence:
+                return
+            self._leader = True
+            batch, self._pending = self._pending, []
+            level, self._pending_level = self._pending_level, 0
+            last = self._sequence
+        started = _time.perf_counter()
+        try:
+            self.acquire()
+            try:
+                self._write_batch(batch, level)
+            finally:
+                self.release()
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+        elapsed = _time.perf_counter() - started
+        with self._commit_lock:
+            self._committed_sequence = last
+            self._leader = False
+            self.batches += 1
+            self.records += len(batch)
+            self.max_batch_size = max(self.max_batch_size, len(batch))
+            self.commit_time += elapsed
+            self.max_commit_time = max(self.max_commit_time, elapsed)
+            # One of the waiting threads becomes the next leader
+            self._committed.notify_all()
+
+    def _write_batch(self, texts: _List[str], level: int) -> None:
+        """Write a batch and apply the durability policy; the lock of the handler
+        must be held."""
+        if self.stream is None:
+            self.stream = self._open()
+        writer = self._get_raw_writer()
+        if writer is not None:
+            writer.write_many(texts)
+        else:
+            self.stream.write(''.join(texts))
+        if self.durability == 'none':
+            return
+        if writer is None:
+            self.stream.flush()
+        if self.durability == 'fsync-level':
+            if level >= self.fsync_level:
+                self._sync()
+        elif self.durability == 'fsync-interval':
+            wait = self._last_sync + self.fsync_interval / 1000 - _time.monotonic()
+            if wait <= 0:
+                self._sync()
+            else:
+                self._unsynced = True
+                self._syncer.schedule(wait)
+
+    def _sync(self) -> None:
+        """Sync the file to the disk; the lock of the handler must be held."""
+        _os.fsync(self.stream.fileno())
+        self._last_sync = _time.monotonic()
+        self._unsynced = False
+        self.fsyncs += 1
+
+    def _timed_sync(self) -> None:
+        """Sync the batches that were written since the last sync."""
+        self.acquire()
+        try:
+            if self._unsynced and self.stream is not None:
+                self._sync()
+        except Exception:  # pylint: disable=broad-except
+            if _logging.raiseExceptions:
+                _traceback.print_exc(file=_sys.stderr)
+        finally:
+            self.release()
+
+    def stats(self) -> _Dict[str, float]:
+        """Return the statistics of the commits.
+
+        :return: A dictionary with the number of the batches, the records and the syncs,
+            the mean and the maximum number of records per batch, and the mean and the
+            maximum time a commit took, in milliseconds.
+        """
+        with self._commit_lock:
+            batches = self.batches or 1
+            return {
+                'batches': self.batches,
+                'records': self.records,
+                'fsyncs': self.fsyncs,
+                'mean_batch_size': self.records / batches,
+                'max_batch_size': self.max_batch_size,
+                'mean_commit_ms': self.commit_time / batches * 1000,
+                'max_commit_ms': self.max_commit_time * 1000
+            }
+
+    def close(self) -> None:
+        """Sync the file if the policy promises it and close it."""
+        # The syncing thread takes the lock of the handler
+        self._syncer.stop()
+        self.acquire()
+        try:
+            if self._unsynced and self.stream is not None:
+                self._sync()
+        finally:
+            self.release()
+        super().close()
+
+
+class CompressedFileHandler(RotatingFileHandler):
+    """A RotatingFileHandler that writes the records compressed with gzip, bz2 or
+    lzma.
+
+    The records go through one compressor, which is finished at sync points, at most
+    `sync_interval` milliseconds after a record is written, and when the handler is
+    flushed or closed; the next records start a new compressed stream in the same
+    file. So the file is a valid multi-stream file at every sync point (`zcat`,
+    `bzcat`, `xzcat` and Python read all of its streams), and a crash loses at most
+    the records of the last interval.
+
+    `max_bytes` is compared with the compressed size of the file; as the compressor
+    holds some data back, the files may grow a little past it.
+
+    >>> import log21
+    >>>
+    >>> logger = log21.Logger('Verbose', log21.DEBUG)
+    >>> logger.addHandler(log21.CompressedFileHandler(
+    ...     'debug.log.gz', max_bytes='1GiB', backup_count=5))
+    """
+
+    def __init__(
+        self,
+        filename,
+        compression: _Literal['gzip', 'bz2', 'lzma'] = 'gzip',
+        sync_interval: float = 1000,
+        max_bytes: _Union[_FileSize, str, int] = 0,
+        backup_count: int = 0,
+        compress_level: _Optional[int] = None,
+        fsync: bool = False,
+        mode: str = 'a',
+        encoding: _Optional[str] = None,
+        delay: bool = False,
+        errors=None,
+        formatter=None,
+        level=None
+    ) -> None:
+        """Initialize the handler.
+
+        :param filename: The filename of the log file.
+        :param compression: The compression: 'gzip', 'bz2' or 'lzma' (xz).
+        :param sync_interval: The maximum number of milliseconds a record may wait in
+            the compressor.
+        :param max_bytes: The maximum compressed size of the file: a FileSize, a
+            string like "512MiB" or a number of bytes. 0 means no limit.
+        :param backup_count: The number of the old files to keep.
+        :param compress_level: The compression level (the preset for lzma). None
+            means the default of the compression.
+        :param fsync: Whether to sync the file to the disk at the sync points.
+        :param mode: The mode to open the file in: 'a' or 'w'.
+        :param encoding: The encoding of the text. Defaults to UTF-8.
+        :param delay: Whether to delay opening the file.
+        :param errors: The error handling scheme of the encoding.
+        :param formatter: The formatter to use.
+        :param level: The level to use.
+        """
+        if compression not in _COMPRESSORS:
+            raise ValueError("`compression` must be one of: 'gzip', 'bz2', 'lzma'")
+        self.compression = compression
+        self.sync_interval = sync_interval
+        self.compress_level = compress_level
+        self.fsync = fsync
+        self._compressor = self._new_compressor()
+        self._unsynced = False
+        self._syncer = _PeriodicFlusher(
+            self._timed_sync, sync_interval / 1000, name='log21-sync'
+        )
+        super().__init__(
+            filename,
+            mode,
+            max_bytes,
+            backup_count,
+            encoding or 'utf-8',
+            delay,
+            errors,
+            formatter=formatter,
+            level=level
+        )
+        self._encoding = encoding or 'utf-8'
+        self._errors = errors or 'strict'
+
+    def _new_compressor(self):  # noqa: ANN202
+        """Make a compressor that starts a new compressed stream."""
+        if self.compression == 'gzip':
+            # 31: a gzip header and trailer around the deflate data
+            return _zlib.compressobj(
+                -1 if self.compress_level is None else self.compress_level,
+                _zlib.DEFLATED, 31
+            )
+        module = _importlib.import_module(self.compression)
+        if self.compression == 'bz2':
+            return module.BZ2Compressor(
+                9 if self.compress_level is None else self.compress_level
+            )
+        return module.LZMACompressor(preset=self.compress_level)
+
+    def _open(self):  # noqa: ANN202
+        stream = open(  # noqa: SIM115
+            self.baseFilename, self.mode.replace('b', '').replace('t', '') + 'b'
+        )
+        self._size = _os.fstat(stream.fileno()).st_size
+        return stream
+
+    def backup_name(self, number: int) -> str:
+        """Return the name of a backup of the file, keeping the extension of the
+        compression at the end.
+
+        :param number: The number of the backup, 1 being the newest.
+        :return: The path of the backup.
+        """
+        root, extension = _os.path.splitext(self.baseFilename)
+        if extension == _COMPRESSORS[self.compression]:
+            return f'{root}.{number}{extension}'
+        return super().backup_name(number)
+
+    def _write_chunks(self, chunks: _List[str]) -> None:
+        data = self._compressor.compress(
+            ''.join(chunks).encode(self._encoding, self._errors)
+        )
+        self._unsynced = True
+        if data:
+            self.stream.write(data)
+            self._size += len(data)
+        if 0 < self.max_bytes <= self._size:
+            self._rollover()
+        else:
+            self._syncer.schedule()
+
+    def _sync(self) -> None:
+        """Finish the compressed stream and write it out; the lock of the handler must
+        be held."""
+        if not self._unsynced or self.stream is None:
+            return
+        data = self._compressor.flush()
+        self._compressor = self._new_compressor()
+        self._unsynced = False
+        self.stream.write(data)
+        self._size += len(data)
+        self.stream.flush()
+        if self.fsync:
+            _os.fsync(self.stream.fileno())
+
+    def _timed_sync(self) -> None:
+        self.acquire()
+        try:
+            self._sync()
+            # The compressors that hold much data back (e.g. bz2) only make the file
+            # grow at the sync points
+            if 0 < self.max_bytes <= self._size:
+                self._rollover()
+        except Exception:  # pylint: disable=broad-except
+            if _logging.raiseExceptions:
+                _traceback.print_exc(file=_sys.stderr)
+        finally:
+            self.release()
+
+    def do_rollover(self) -> None:
+        """Finish the compressed stream, then rename the file and its backups and
+        start a new file; the lock of the handler must be held."""
+        self._sync()
+        super().do_rollover()
+
+    def flush(self) -> None:
+        """Finish the compressed stream and write it to the file."""
+        self.acquire()
+        try:
+            self._sync()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        """Finish the compressed stream and close the file."""
+        # The syncing thread takes the lock of the handler
+        self._syncer.stop()
+        super().close()
+
+
+# Renders the tracebacks of the records of BinaryFileHandler like logging does
+_exception_formatter = _logging.Formatter()
+
+
+class BinaryFileHandler(FileHandler):
+    """A FileHandler that writes the records in a compact binary format instead of
+    formatting them.
+
+    The message templates, the logger names, the level names and the other strings are
+    written once, and so is every call site (the template, the logger, the level, the
+    path and the line) and every thread; after that a record is the ids of its call
+    site and thread, its time and its serialized arguments. Nothing is formatted while
+    logging; `python -m log21.decode` renders the file offline with the layouts of
+    ColorizingFormatter, colored or plain:
+
+        python -m log21.decode app.log21 --fmt '%(asctime)s %(name)s %(message)s'
+
+    The arguments that are not numbers, strings or bytes are kept as their `str` and
+    `repr`, so the decoder never needs the classes of the program.
+
+    >>> import log21
+    >>>
+    >>> logger = log21.Logger('Hot', log21.DEBUG)
+    >>> logger.addHandler(log21.BinaryFileHandler('app.log21'))
+    >>> logger.info('Request %s took %.2fms', args=('/index', 1.5))
+    """
+
+    def __init__(
+        self,
+        filename,
+        mode: str = 'a',
+        delay: bool = False,
+        max_table_size: int = 65536,
+        level=None
+    ) -> None:
+        """Initialize the handler.
+
+        :param filename: The filename of the log file.
+        :param mode: The mode to open the file in: 'a' or 'w'.
+        :param delay: Whether to delay opening the file.
+        :param max_table_size: The number of the interned strings, call sites and
+            threads that makes the handler start new tables, so a program that logs
+            many different messages (e.g. f-strings) doesn't keep them all in memory.
+        :param level: The level to use.
+        """
+        self._writer = _BinaryWriter(max_table_size)
+        super().__init__(
+            filename, mode.replace('b', '').replace('t', '') + 'b', None, delay,
+            level=level
+        )
+
+    def _open(self):  # noqa: ANN202
+        stream = open(self.baseFilename, self.mode)  # noqa: SIM115
+        stream.write(self._writer.reset(_os.fstat(stream.fileno()).st_size > 0))
+        return stream
+
+    @staticmethod
+    def _message(record) -> tuple:
+        """Split the message of a record into the parts that the file keeps.
+
+        :param record: The record.
+        :return: The flags, the template, the end, the parts (of a joined message) and
+            the arguments of the message, and the traceback text.
+        """
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        msg = record.msg
+        args = record.args or ()
+        if isinstance(msg, _LazyMessage):
+            parts = msg.parts
+            if parts and type(parts[0]) is str:  # noqa: E721
+                return _JOINED, parts[0], msg.end, parts[1:], args, record.exc_text
+            return (
+                _JOINED | _NO_TEMPLATE, '', msg.end, parts, args, record.exc_text
+            )
+        if not isinstance(msg, str):
+            msg = str(msg)
+        return 0, msg, '', (), args, record.exc_text
+
+    def _pack(self, buffer: bytearray, record) -> None:
+        self._writer.pack_record(buffer, record, self._message(record))
+
+    def emit(self, record) -> None:
+        """Emit a record."""
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            buffer = bytearray()
+            self._pack(buffer, record)
+            self.stream.write(buffer)
             self.flush()
         except Exception:  # pylint: disable=broad-except
             self.handleError(record)
+
+    def handle_batch(self, records) -> None:
+        """Handle several records with one acquisition of the lock and one write.
+
+        :param records: The records to handle.
+        """
+        records = [record for record in records if self.filter(record)]
+        if not records:
+            return
+        self.acquire()
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            buffer = bytearray()
+            for record in records:
+                try:
+                    self._pack(buffer, record)
+                except Exception:  # pylint: disable=broad-except
+                    self.handleError(record)
+            if buffer:
+                try:
+                    self.stream.write(buffer)
+                    self.flush()
+                except Exception:  # pylint: disable=broad-except
+                    self.handleError(records[-1])
+        finally:
+            self.release()
+
+
+class AsyncDecolorizingFileHandler(DecolorizingFileHandler):
+    """A DecolorizingFileHandler that writes the records of the coroutine methods of
+    Logger (e.g. `await logger.ainfo(...)`) in a dedicated thread, so a slow disk never
+    blocks the event loop."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._executor: _Optional[_ThreadPoolExecutor] = None
+
+    async def ahandle(self, record) -> bool:
+        """Handle the record in the thread of the handler.
+
+        :param record: The record to handle.
+        :return: Whether the record passed the filters.
+        """
+        if self._executor is None:
+            self._executor = _ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='log21-file'
+            )
+        return await _asyncio.get_running_loop().run_in_executor(
+            self._executor, self.handle, record
+        )
+
+    def close(self) -> None:
+        """Wait for the records that are being written and close the file."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        super().close()
@@ -3,20 +3,113 @@
 
 # yapf: disable
 
+import re as _re
 import time as _time
+import string as _string
 from typing import (Dict as _Dict, Tuple as _Tuple, Literal as _Literal,
-                    Mapping as _Mapping, Optional as _Optional)
+                    Mapping as _Mapping, Optional as _Optional, FrozenSet as _FrozenSet)
+from weakref import WeakKeyDictionary as _WeakKeyDictionary
+from functools import lru_cache as _lru_cache
 from logging import Formatter as __Formatter
 
-from log21.colors import get_colors as _gc, ansi_escape
+from log21.colors import get_colors as _gc, strip_escapes as _strip_escapes
 from log21.levels import INFO, DEBUG, ERROR, INPUT, PRINT, WARNING, CRITICAL
 
 # yapf: enable
 
 __all__ = ['ColorizingFormatter', 'DecolorizingFormatter']
 
+# The color attributes of ColorizingFormatter
+_COLOR_ATTRIBUTES = (
+    'time_color', 'name_color', 'pathname_color', 'filename_color', 'module_color',
+    'func_name_color', 'thread_name_color', 'message_color'
+)
+_RESET = '\033[0m'
+# The color of the levels that have no color in `level_colors`
+_DEFAULT_LEVEL_SGR = _gc('lw')
+
+
+_percent_field = _re.compile(r'%\(([^)]*)\)')
+_field_name = _re.compile(r'\w+')
+
+
+def _brace_fields(fmt: str) -> set:
+    """Collect the names of the record attributes used in a `{` style format string.
+
+    :param fmt: The format string.
+    :return: The attribute names.
+    """
+    fields = set()
+    for _, field_name, format_spec, _ in _string.Formatter().parse(fmt):
+        if field_name:
+            match = _field_name.match(field_name)
+            if match:
+                fields.add(match.group())
+        if format_spec:
+            fields |= _brace_fields(format_spec)
+    return fields
+
+
+@_lru_cache(maxsize=None)
+def _format_fields(fmt: str, style: str) -> _FrozenSet[str]:
+    """Find the record attributes that a format string refers to.
+
+    :param fmt: The format string.
+    :param style: The style of the format string: `%`, `{` or `$`.
+    :return: The attribute names.
+    """
+    if style == '{':
+        try:
+            return frozenset(_brace_fields(fmt))
+        except ValueError:
+            # An invalid format string fails later, when it is used
+            return frozenset()
+    if style == '$':
+        return frozenset(
+            match.group('named') or match.group('braced')
+            for match in _string.Template.pattern.finditer(fmt)
+            if match.group('named') or match.group('braced')
+        )
+    return frozenset(_percent_field.findall(fmt))
+
+
+class _RecordView:  # pylint: disable=too-few-public-methods
+    """A copy of the attributes of a LogRecord that a formatter can change freely.
+
+    Formatters render from views so that the record reaches the next handler as it
+    was created.
+    """
+
+    def __init__(self, attributes: dict) -> None:
+        self.__dict__ = attributes.copy()
+
+
+# The values rendered for each record so far, shared by all its formatters. They are
+# kept out of the records, so they never travel with them (e.g. pickled by
+# SocketHandler or dumped by a JSON formatter)
+_render_caches: '_WeakKeyDictionary[object, dict]' = _WeakKeyDictionary()
+
+
+def _render_cache(record) -> dict:  # noqa: ANN001
+    """Return the values rendered for a record so far, shared by all its formatters.
+
+    :param record: The LogRecord.
+    :return: A dictionary that lives as long as the record.
+    """
+    try:
+        cache = _render_caches.get(record)
+        if cache is None:
+            cache = _render_caches.setdefault(record, {})
+    except TypeError:
+        # The record can't be weakly referenced; nothing is shared
+        return {}
+    return cache
+
 
 class _Formatter(__Formatter):
+    # The key and the text of the last formatted second; one tuple, so that threads
+    # always see a key together with its own text
+    _time_cache: _Tuple[tuple, str] = ((), '')
 
     def __init__(
         self,
@@ -57,6 +150,7 @@ class _Formatter(__Formatter):
         :param level_names: A dictionary mapping logging levels to their names.
         """
         super().__init__(fmt=fmt, datefmt=datefmt, style=style)
+        self._style_char = style
 
         self._level_names: _Dict[int, str] = {
             DEBUG: 'DEBUG',
@@ -88,25 +182,158 @@ class _Formatter(__Formatter):
         else:
             self._level_names = {}
 
-    def format(self, record) -> str:  # noqa: ANN001
-        record.message = record.getMessage()
-        if self.usesTime():
-            record.asctime = self.formatTime(record, self.datefmt)
+    @property
+    def fields(self) -> _FrozenSet[str]:
+        """The names of the record attributes that the format string uses."""
+        return _format_fields(self._style._fmt, self._style_char)  # noqa: SLF001
 
-        record.levelname = self.level_names.get(record.levelno, 'NOTSET')
+    def usesTime(self) -> bool:
+        """Check if the format uses the creation time of the record."""
+        return 'asctime' in self.fields
 
-        s = self.formatMessage(record)  # pylint: disable=invalid-name
+    def formatTime(self, record, datefmt=None) -> str:  # noqa: ANN001
+        """Returns the creation time of the specified LogRecord as formatted text.
+
+        The seconds are formatted once and reused by the records that are created in
+        the same second; the milliseconds are appended when no `datefmt` is given.
+        """
+        seconds = int(record.created)
+        # The time zone is in the key to notice the changes made by `time.tzset`
+        key = (
+            seconds, datefmt, self.default_time_format, self.converter, _time.tzname,
+            _time.timezone
+        )
+        cached_key, text = self._time_cache
+        if cached_key != key:
+            text = _time.strftime(
+                datefmt or self.default_time_format, self.converter(seconds)
+            )
+            self._time_cache = (key, text)
+        if datefmt or not self.default_msec_format:
+            return text
+        return self.default_msec_format % (text, record.msecs)
+
+    def _message(self, record) -> str:  # noqa: ANN001
+        """Return `record.getMessage()`, computed once per record for all formatters.
+
+        :param record: The LogRecord.
+        :return: The message of the record.
+        """
+        cache = _render_cache(record)
+        cached = cache.get('message')
+        # A handler may replace the message before formatting (e.g. check_cr)
+        if cached is not None and cached[0] is record.msg and cached[1] is record.args:
+            return cached[2]
+        message = record.getMessage()
+        cache['message'] = (record.msg, record.args, message)
+        return message
+
+    def _asctime(self, record) -> str:  # noqa: ANN001
+        """Return `self.formatTime(record, self.datefmt)`, computed once per record for
+        all the formatters that format time the same way.
+
+        :param record: The LogRecord.
+        :return: The formatted creation time of the record.
+        """
+        key = (
+            'asctime', type(self).formatTime, self.converter, self.datefmt,
+            self.default_time_format, self.default_msec_format
+        )
+        cache = _render_cache(record)
+        asctime = cache.get(key)
+        if asctime is None:
+            asctime = cache[key] = self.formatTime(record, self.datefmt)
+        return asctime
+
+    def _view(self, record) -> _RecordView:  # noqa: ANN001
+        """Render the message, time and level name of a record for this formatter.
+
+        Like `logging.Formatter`, it sets `message` and `asctime` on the record, but
+        the level name is only set on the returned view.
+
+        :param record: The LogRecord.
+        :return: A view of the record to format.
+        """
+        fields = self.fields
+        record.message = self._message(record)
+        if 'asctime' in fields:
+            record.asctime = self._asctime(record)
+        view = _RecordView(record.__dict__)
+        if 'levelname' in fields:
+            view.levelname = self.level_names.get(record.levelno, 'NOTSET')
+        return view
+
+    def format(self, record) -> str:  # noqa: ANN001
+        return self._append_traceback(self.formatMessage(self._view(record)), record)
+
+    def _append_traceback(self, text: str, record) -> str:  # noqa: ANN001
+        """Append the traceback and the stack information of the record to the
+        formatted message."""
+        # Cache the traceback text to avoid converting it multiple times
+        # (it's constant anyway)
         if record.exc_info and not record.exc_text:
             record.exc_text = self.formatException(record.exc_info)
         if record.exc_text:
-            if s[-1:] != "\n":
-                s = s + "\n"
-            s = s + record.exc_text
+            if text[-1:] != "\n":
+                text = text + "\n"
+            text = text + record.exc_text
         if record.stack_info:
-            if s[-1:] != "\n":
-                s = s + "\n"
-            s = s + self.formatStack(record.stack_info)
-        return s
+            if text[-1:] != "\n":
+                text = text + "\n"
+            text = text + self.formatStack(record.stack_info)
+        return text
+
+
+class _LevelColors(dict):
+    """The level colors of a ColorizingFormatter.
+
+    The escape sequence of each level is resolved whenever the mapping changes and is
+    kept in `sgr`.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.sgr: _Dict[int, str] = {}
+        self._resolve()
+
+    def _resolve(self) -> None:
+        self.sgr = {level: _gc(*colors) for level, colors in self.items()}
+
+    def __setitem__(self, level: int, colors: _Tuple[str, ...]) -> None:
+        super().__setitem__(level, colors)
+        self.sgr[level] = _gc(*colors)
+
+    def __delitem__(self, level: int) -> None:
+        super().__delitem__(level)
+        del self.sgr[level]
+
+    def __ior__(self, other):  # noqa: ANN001, ANN204
+        super().__ior__(other)
+        self._resolve()
+        return self
+
+    def update(self, *args, **kwargs) -> None:
+        super().update(*args, **kwargs)
+        self._resolve()
+
+    def setdefault(self, level: int, colors: _Tuple[str, ...] = ()) -> _Tuple[str, ...]:
+        if level not in self:
+            self[level] = colors
+        return self[level]
+
+    def pop(self, level: int, *default):  # noqa: ANN002, ANN201
+        value = super().pop(level, *default)
+        self.sgr.pop(level, None)
+        return value
+
+    def popitem(self) -> _Tuple[int, _Tuple[str, ...]]:
+        item = super().popitem()
+        self.sgr.pop(item[0], None)
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        self.sgr.clear()
 
 
 class ColorizingFormatter(_Formatter):  # pylint: disable=too-many-instance-attributes
@@ -150,8 +377,15 @@ class ColorizingFormatter(_Formatter):  # pylint: disable=too-many-instance-attr
             message.
         :param message_color: The color to use for the message portion of the message.
         """
+        # Whether a linked plain formatter shares the rendering of this formatter
+        self._linked = False
+        # The resolved escape sequences of the color attributes
+        self._sgr: _Dict[str, str] = {
+            name: _gc(*getattr(self, name))
+            for name in _COLOR_ATTRIBUTES
+        }
         super().__init__(fmt=fmt, datefmt=datefmt, style=style, level_names=level_names)
-        self.level_colors: _Dict[int, _Tuple[str, ...]] = {
+        self.level_colors = {
             DEBUG: ('lightblue', ),
             INFO: ('green', ),
             WARNING: ('lightyellow', ),
@@ -199,75 +433,171 @@ class ColorizingFormatter(_Formatter):  # pylint: disable=too-many-instance-attr
                 raise TypeError('`message_color` must be a tuple!')
             self.message_color = message_color
 
-    def format(self, record) -> str:  # noqa: ANN001
-        """Colorizes the record and returns the formatted message."""
-        record.message = record.getMessage()
-        if self.usesTime():
-            record.asctime = self.formatTime(record, self.datefmt)
+    def __setattr__(self, name: str, value) -> None:  # noqa: ANN001
+        super().__setattr__(name, value)
+        if name in _COLOR_ATTRIBUTES:
+            self._sgr[name] = _gc(*value)
 
-        record.levelname = self.level_names.get(record.levelno, 'NOTSET')
+    @property
+    def level_colors(self) -> _Dict[int, _Tuple[str, ...]]:
+        """Get the level colors mapping."""
+        return self._level_colors
 
-        record = self.colorize(record)
+    @level_colors.setter
+    def level_colors(self, level_colors: _Mapping[int, _Tuple[str, ...]]) -> None:
+        self._level_colors = _LevelColors(level_colors)
 
-        s = self.formatMessage(record)  # pylint: disable=invalid-name
-        # Cache the traceback text to avoid converting it multiple times
-        # (it's constant anyway)
-        if record.exc_info and not record.exc_text:
-            record.exc_text = self.formatException(record.exc_info)
-        if record.exc_text:
-            if s[-1:] != "\n":
-                s = s + "\n"
-            s = s + record.exc_text
-        if record.stack_info:
-            if s[-1:] != "\n":
-                s = s + "\n"
-            s = s + self.formatStack(record.stack_info)
-        return s
+    def plain_formatter(self) -> 'DecolorizingFormatter':
+        """Return a DecolorizingFormatter with the same format as this formatter.
+
+        It is made again when the format or the time settings of this formatter
+        change. The methods that a subclass overrides are not used by it.
+        """
+        key = (
+            self._style._fmt,  # noqa: SLF001
+            self.datefmt,
+            self._style_char,
+            self._linked,
+            self.converter,
+            self.default_time_format,
+            self.default_msec_format
+        )
+        plain = self.__dict__.get('_plain')
+        if plain is None or plain[0] != key:
+            if self._linked:
+                formatter = self.linked_plain_formatter()
+            else:
+                formatter = DecolorizingFormatter(
+                    key[0], self.datefmt, style=self._style_char
+                )
+                formatter.converter = self.converter
+                formatter.default_time_format = self.default_time_format
+                formatter.default_msec_format = self.default_msec_format
+            plain = self._plain = (key, formatter)
+        formatter = plain[1]
+        if formatter._level_names is not self._level_names:  # noqa: SLF001
+            formatter._level_names = self._level_names  # noqa: SLF001
+        return formatter
+
+    def linked_plain_formatter(
+        self, strip_carriage_return: bool = False
+    ) -> 'DecolorizingFormatter':
+        """Return a DecolorizingFormatter that shares the rendering of this formatter.
+
+        A record that is formatted by both of them, e.g. by a stream handler and a file
+        handler of the same logger, is rendered once by `format_pair`, which makes the
+        colored and the plain text together.
+
+        :param strip_carriage_return: Whether to leave out the carriage return at the
+            beginning of the format string (e.g. the one that `get_logger` adds for the
+            console) from the plain text.
+        :return: The linked formatter.
+        """
+        fmt = self._style._fmt  # noqa: SLF001
+        skip = 1 if strip_carriage_return and fmt[:1] == '\r' else 0
+        formatter = DecolorizingFormatter(
+            fmt[skip:], self.datefmt, style=self._style_char
+        )
+        formatter.converter = self.converter
+        formatter.default_time_format = self.default_time_format
+        formatter.default_msec_format = self.default_msec_format
+        formatter._level_names = self._level_names  # noqa: SLF001
+        formatter._source = (self, skip)  # noqa: SLF001
+        self._linked = True
+        return formatter
+
+    def format_pair(
+        self,
+        record,  # noqa: ANN001
+        colored: bool = True
+    ) -> _Tuple[str, str]:
+        """Format the record with and without colors in one pass.
+
+        The colors are only added to the colored copy of the rendered attributes, so
+        the plain text doesn't need them removed; only the colors that are part of the
+        values themselves (e.g. the message) are removed from it. The result is kept
+        on the record for the other handlers that use this formatter.
+
+        :param record: The LogRecord.
+        :param colored: Whether the colored text is needed. Without it (e.g. the
+            console doesn't show colors) the record is never colorized and the plain
+            text is returned for both; the rendered view is kept so a handler that
+            needs the colors later only colorizes it.
+        :return: The colored and the plain text.
+        """
+        cache = _render_cache(record)
+        key = ('pair', self)
+        cached = cache.get(key)
+        # A handler may replace the message before formatting (e.g. check_cr)
+        if cached is not None and cached[0] is record.msg and cached[1] is record.args:
+            view = cached[3]
+            if view is None or not colored:
+                return cached[2]
+            plain = cached[2][1]
+        else:
+            view = self._view(record)
+            plain = _strip_escapes(
+                self._append_traceback(self.formatMessage(view), record)
+            )
+            if not colored:
+                pair = (plain, plain)
+                cache[key] = (record.msg, record.args, pair, view)
+                return pair
+        colored_text = self._append_traceback(
+            self.formatMessage(self.colorize(_RecordView(view.__dict__))), record
+        )
+        pair = (colored_text, plain)
+        cache[key] = (record.msg, record.args, pair, None)
+        return pair
+
+    def format(self, record) -> str:  # noqa: ANN001
+        """Colorizes a view of the record and returns the formatted message."""
+        if self._linked:
+            return self.format_pair(record)[0]
+        return self._append_traceback(
+            self.formatMessage(self.colorize(self._view(record))), record
+        )
 
     def colorize(self, record):  # noqa: ANN001, ANN201
-        """Colorizes the record attributes.
+        """Colorizes the record attributes that the format string uses.
+
+        `format` passes a view of the record, so the record itself is left untouched.
 
         :param record:
         :return: colorized record
         """
-        reset = '\033[0m'
-
-        if hasattr(record, 'asctime'):
-            record.asctime = _gc(*self.time_color) + record.asctime + reset
-        if hasattr(record, 'levelno'):
-            record.levelname = _gc(
-                *self.level_colors.get(int(record.levelno), ('lw', ))
-            ) + getattr(record, 'levelname', 'NOTSET') + reset
-        if hasattr(record, 'name'):
-            record.name = _gc(*self.name_color) + str(record.name) + reset
-        if hasattr(record, 'pathname'):
-            record.pathname = _gc(*self.pathname_color) + record.pathname + reset
-        if hasattr(record, 'filename'):
-            record.filename = _gc(*self.filename_color) + record.filename + reset
-        if hasattr(record, 'module'):
-            record.module = _gc(*self.module_color) + record.module + reset
-        if hasattr(record, 'funcName'):
-            record.funcName = _gc(*self.func_name_color) + record.funcName + reset
-        if hasattr(record, 'threadName'):
-            record.threadName = _gc(*self.thread_name_color) + record.threadName + reset
-        if hasattr(record, 'message'):
-            record.message = _gc(*self.message_color) + record.message
+        fields = self.fields
+        sgr = self._sgr
+
+        if 'asctime' in fields and hasattr(record, 'asctime'):
+            record.asctime = sgr['time_color'] + record.asctime + _RESET
+        if 'levelname' in fields and hasattr(record, 'levelno'):
+            record.levelname = self._level_colors.sgr.get(
+                int(record.levelno), _DEFAULT_LEVEL_SGR
+            ) + getattr(record, 'levelname', 'NOTSET') + _RESET
+        if 'name' in fields and hasattr(record, 'name'):
+            record.name = sgr['name_color'] + str(record.name) + _RESET
+        if 'pathname' in fields and hasattr(record, 'pathname'):
+            record.pathname = sgr['pathname_color'] + record.pathname + _RESET
+        if 'filename' in fields and hasattr(record, 'filename'):
+            record.filename = sgr['filename_color'] + record.filename + _RESET
+        if 'module' in fields and hasattr(record, 'module'):
+            record.module = sgr['module_color'] + record.module + _RESET
+        if 'funcName' in fields and hasattr(record, 'funcName'):
+            record.funcName = sgr['func_name_color'] + record.funcName + _RESET
+        if 'threadName' in fields and hasattr(record, 'threadName'):
+            record.threadName = sgr['thread_name_color'] + record.threadName + _RESET
+        if 'message' in fields and hasattr(record, 'message'):
+            record.message = sgr['message_color'] + record.message
 
         return record
 
 
 class DecolorizingFormatter(_Formatter):
     """Formatter that removes color codes from the log records."""
-
-    def formatTime(self, record, datefmt=None) -> str:  # noqa: ANN001
-        """Returns the creation time of the specified LogRecord as formatted text."""
-        ct = self.converter(int(record.created))
-        if datefmt:
-            s = _time.strftime(datefmt, ct)
-        else:
-            t = _time.strftime(self.default_time_format, ct)
-            s = self.default_msec_format % (t, record.msecs)
-        return s
+    # The ColorizingFormatter that renders the records for this formatter and the
+    # number of characters to skip at the beginning of its plain text
+    _source: _Optional[_Tuple[ColorizingFormatter, int]] = None
 
     def format(self, record) -> str:  # noqa: ANN001
         """Decolorizes the record and returns the formatted message.
@@ -275,14 +605,18 @@ class DecolorizingFormatter(_Formatter):
         :param record:
         :return: str
         """
+        if self._source is not None:
+            source, skip = self._source
+            return source.format_pair(record, colored=False)[1][skip:]
         return self.decolorize(super().format(record))
 
     @staticmethod
     def decolorize(text: str) -> str:
-        """Removes all ansi colors in the text.
+        """Removes all ansi colors, the other ANSI escape sequences and the hex colors
+        of log21 in the text.
 
         :param text: str: Input text
         :return: str: decolorized text
         """
 
-        return ansi_escape.sub('', text)
+        return _strip_escapes(text)
@@ -3,14 +3,21 @@
 
 # yapf: disable
 
+import io as _io
+import os as _os
 import re as _re
 import sys as _sys
 import logging as _logging
-from types import MethodType as _MethodType
-from typing import (TYPE_CHECKING as _TYPE_CHECKING, Any as _Any, List, Union as _Union,
-                    Literal as _Literal, Mapping, Callable as _Callable,
+import threading as _threading
+import traceback as _traceback
+from typing import (TYPE_CHECKING as _TYPE_CHECKING, Any as _Any, Dict as _Dict, List,
+                    Union as _Union, Literal as _Literal, Mapping,
+                    Callable as _Callable, Iterable as _Iterable,
                     Optional as _Optional, Sequence as _Sequence)
+from types import MethodType as _MethodType
+from weakref import WeakSet as _WeakSet
 from getpass import getpass as _getpass
+from functools import lru_cache as _lru_cache, cached_property as _cached_property
 from logging import raiseExceptions as _raiseExceptions
 
 from log21.levels import INFO, DEBUG, ERROR, INPUT, PRINT, NOTSET, WARNING, CRITICAL
@@ -20,11 +27,103 @@ if _TYPE_CHECKING:
 
 # yapf: enable
 
-__all__ = ['Logger']
+__all__ = ['Logger', 'LazyMessage']
+
+
+class LazyMessage:
+    """A log message made of several parts that are joined only when it is needed.
+
+    The parts are stringified on the first `str()` call (e.g. by
+    `LogRecord.getMessage`) and the result is memoized, so a record that is filtered
+    out by every handler never pays for it and the rest of the handlers reuse the
+    joined text.
+    """
+    __slots__ = ('parts', 'end', '_text')
+
+    def __init__(self, parts: tuple, end: str = '\n') -> None:
+        """Initialize a LazyMessage object.
+
+        :param parts: The objects to join with a space.
+        :param end: The string to append to the joined parts.
+        """
+        self.parts = parts
+        self.end = end
+        self._text: _Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = ' '.join([str(part) for part in self.parts]) + self.end
+        return self._text
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({str(self)!r})'
+
+    def __reduce__(self) -> tuple:
+        # Pickles as the joined text so the parts never have to be picklable
+        return str, (str(self), )
+
+
+# Every log21 Logger, so that their enabled-level tables can be invalidated together
+_loggers: '_WeakSet[Logger]' = _WeakSet()
+_loggers_lock = _threading.Lock()
+
+
+def _clear_level_tables() -> None:
+    """Drop the enabled-level table of every Logger so that it is rebuilt on its next
+    use."""
+    with _loggers_lock:
+        loggers = list(_loggers)
+    for logger in loggers:
+        logger.__dict__.pop('_level_table', None)
+
+
+class _LevelCache(dict):
+    """A `_cache` for root loggers that also invalidates the enabled-level tables.
+
+    `logging.Manager._clear_cache`, which is called by `setLevel` and
+    `logging.disable`, always ends by clearing the cache of its root logger, so
+    setting this on the managers' roots keeps every table up to date.
+    """
+    __slots__ = ()
+
+    def clear(self) -> None:
+        super().clear()
+        _clear_level_tables()
+
+
+if not isinstance(_logging.root._cache, _LevelCache):  # noqa: SLF001
+    _logging.root._cache = _LevelCache(_logging.root._cache)  # noqa: SLF001
+
+
+def _make_message(msg: tuple, end: str) -> _Union[str, LazyMessage]:
+    """Build the message of a record from the positional arguments of a log call.
+
+    A single string is concatenated right away as it is cheap, anything else is
+    wrapped in a LazyMessage.
+    """
+    if len(msg) == 1 and type(msg[0]) is str:  # noqa: E721
+        return msg[0] + end
+    return LazyMessage(msg, end)
+
+
+# The frames of this module are skipped by `findCaller` like the ones of logging
+_srcfile = _os.path.normcase(__file__)
+
+
+def _is_internal_frame(frame) -> bool:  # noqa: ANN001
+    """Whether the frame belongs to logging or log21's Logger rather than to the
+    code that logs."""
+    filename = _os.path.normcase(frame.f_code.co_filename)
+    return (
+        filename in (_srcfile, _logging._srcfile)  # noqa: SLF001
+        or ('importlib' in filename and '_bootstrap' in filename)
+    )
 
 
 class Logger(_logging.Logger):
     """A Logger that can print to the console and log to a file."""
+    # The custom levels added by `add_level` to a logger: {name: level}
+    _custom_levels: Mapping[str, int] = {}
 
     def __init__(
         self,
@@ -40,6 +139,8 @@ class Logger(_logging.Logger):
         :param handlers: The handlers to add to the logger.
         """
         super().__init__(name, level)
+        with _loggers_lock:
+            _loggers.add(self)
         self.setLevel(level)
         self._progress_bar = None
         if handlers:
@@ -57,10 +158,77 @@ class Logger(_logging.Logger):
                     )
                 self.addHandler(handler)
 
+    @_cached_property
+    def _level_table(self) -> _Dict[int, bool]:
+        """Whether the logger is enabled for each level from NOTSET to INPUT.
+
+        The table is built on first use and dropped whenever a level, the
+        manager's `disable` value, `disabled` or the hierarchy changes.
+        """
+        return {level: self._is_enabled_for(level) for level in range(INPUT + 1)}
+
+    def _is_enabled_for(self, level: int) -> bool:
+        """Check a level without the help of the enabled-level table."""
+        if self.disabled or self.manager.disable >= level:
+            return False
+        return level in (PRINT, INPUT) or level >= self.getEffectiveLevel()
+
     def isEnabledFor(self, level: int) -> bool:
         """Is this logger enabled for level 'level'?"""
+        try:
+            return self._level_table[level]
+        except KeyError:
+            return self._is_enabled_for(level)
+
+    def findCaller(self, stack_info: bool = False, stacklevel: int = 1) -> tuple:
+        """Find the source file, the line number, the function name and the stack of
+        the code that logs.
+
+        The frames of the methods of Logger (e.g. `info`, `info_many`, `ainfo`) are
+        skipped along with the ones of logging, so `stacklevel` counts the frames of
+        the caller's code only.
+        """
+        frame = _sys._getframe(1)  # noqa: SLF001
+        while stacklevel > 0:
+            next_frame = frame.f_back
+            if next_frame is None:
+                break
+            frame = next_frame
+            if not _is_internal_frame(frame):
+                stacklevel -= 1
+        code = frame.f_code
+        sinfo = None
+        if stack_info:
+            with _io.StringIO() as stream:
+                stream.write('Stack (most recent call last):\n')
+                _traceback.print_stack(frame, file=stream)
+                sinfo = stream.getvalue().rstrip('\n')
+        return code.co_filename, frame.f_lineno, code.co_name, sinfo
 
-        return (self.level <= level) or (level in (PRINT, INPUT))
+    @property
+    def disabled(self) -> bool:
+        """Whether the logger is disabled."""
+        return self._disabled
+
+    @disabled.setter
+    def disabled(self, value: bool) -> None:
+        self._disabled = value
+        self.__dict__.pop('_level_table', None)
+
+    @property
+    def parent(self) -> _Optional[_logging.Logger]:
+        """The parent of the logger in the hierarchy."""
+        return self._parent
+
+    @parent.setter
+    def parent(self, value: _Optional[_logging.Logger]) -> None:
+        previous = self.__dict__.get('_parent')
+        self._parent = value
+        if previous is not None:
+            # The descendants of this logger may inherit a different level now
+            _clear_level_tables()
+        else:
+            self.__dict__.pop('_level_table', None)
 
     def log(
         self, level: int, *msg, args: tuple = (), end: str = '\n', **kwargs
@@ -72,13 +240,12 @@ class Logger(_logging.Logger):
 
         logger.log(level, "We have a %s", args=("mysterious problem",), exc_info=1)
         """
-        msg = ' '.join([str(m) for m in msg]) + end
         if not isinstance(level, int):
             if _raiseExceptions:
                 raise TypeError('level must be an integer')
             return
         if self.isEnabledFor(level):
-            self._log(level, msg, args, **kwargs)
+            self._log(level, _make_message(msg, end), args, **kwargs)
 
     def debug(self, *msg, args: tuple = (), end: str = '\n', **kwargs) -> None:
         """Log 'msg % args' with severity 'DEBUG'.
@@ -88,9 +255,8 @@ class Logger(_logging.Logger):
 
         logger.debug("Houston, we have a %s", args=("thorny problem",), exc_info=1)
         """
-        if self.isEnabledFor(DEBUG):
-            msg = ' '.join([str(m) for m in msg]) + end
-            self._log(DEBUG, msg, args, **kwargs)
+        if self._level_table[DEBUG]:
+            self._log(DEBUG, _make_message(msg, end), args, **kwargs)
 
     def info(self, *msg, args: tuple = (), end: str = '\n', **kwargs) -> None:
         """Log 'msg % args' with severity 'INFO'.
@@ -100,9 +266,8 @@ class Logger(_logging.Logger):
 
         logger.info("Houston, we have an %s", args=("interesting problem",), exc_info=1)
         """
-        if self.isEnabledFor(INFO):
-            msg = ' '.join([str(m) for m in msg]) + end
-            self._log(INFO, msg, args, **kwargs)
+        if self._level_table[INFO]:
+            self._log(INFO, _make_message(msg, end), args, **kwargs)
 
     def warning(self, *msg, args: tuple = (), end: str = '\n', **kwargs) -> None:
         """Log 'msg % args' with severity 'WARNING'.
@@ -112,9 +277,8 @@ class Logger(_logging.Logger):
 
         logger.warning("Houston, we have a %s", args=("bit of a problem",), exc_info=1)
         """
-        if self.isEnabledFor(WARNING):
-            msg = ' '.join([str(m) for m in msg]) + end
-            self._log(WARNING, msg, args, **kwargs)
+        if self._level_table[WARNING]:
+            self._log(WARNING, _make_message(msg, end), args, **kwargs)
 
     warn = warning
 
@@ -126,9 +290,8 @@ class Logger(_logging.Logger):
 
         logger.write("Houston, we have a %s", args=("bit of a problem",), exc_info=1)
         """
-        if self.isEnabledFor(WARNING):
-            msg = ' '.join([str(m) for m in msg]) + end
-            self._log(WARNING, msg, args, **kwargs)
+        if self._level_table[WARNING]:
+            self._log(WARNING, _make_message(msg, end), args, **kwargs)
 
     def error(self, *msg, args: tuple = (), end: str = '\n', **kwargs) -> None:
         """Log 'msg % args' with severity 'ERROR'.
@@ -138,9 +301,8 @@ class Logger(_logging.Logger):
 
         logger.error("Houston, we have a %s", args=("major problem",), exc_info=1)
         """
-        if self.isEnabledFor(ERROR):
-            msg = ' '.join([str(m) for m in msg]) + end
-            self._log(ERROR, msg, args, **kwargs)
+        if self._level_table[ERROR]:
+            self._log(ERROR, _make_message(msg, end), args, **kwargs)
 
     def exception(  # ty: ignore[invalid-method-override]
         self, *msg, args: tuple = (), exc_info: bool = True, **kwargs
@@ -156,9 +318,8 @@ class Logger(_logging.Logger):
 
         logger.critical("Houston, we have a %s", args=("major disaster",), exc_info=1)
         """
-        if self.isEnabledFor(CRITICAL):
-            msg = ' '.join([str(m) for m in msg]) + end
-            self._log(CRITICAL, msg, args, **kwargs)
+        if self._level_table[CRITICAL]:
+            self._log(CRITICAL, _make_message(msg, end), args, **kwargs)
 
     fatal = critical
 
@@ -170,8 +331,7 @@ class Logger(_logging.Logger):
 
         logger.print("Houston, we have a %s", args=("major disaster",), exc_info=1)
         """
-        msg = ' '.join([str(m) for m in msg]) + end
-        self._log(PRINT, msg, args, **kwargs)
+        self._log(PRINT, _make_message(msg, end), args, **kwargs)
 
     def input(self, *msg, args: tuple = (), end: str = '', **kwargs) -> str:
         """Log 'msg % args'.
@@ -182,8 +342,7 @@ class Logger(_logging.Logger):
         Usage example:
         age = logger.input("Enter your age: ")
         """
-        msg = ' '.join([str(m) for m in msg]) + end
-        self._log(INPUT, msg, args, **kwargs)
+        self._log(INPUT, _make_message(msg, end), args, **kwargs)
         return input()
 
     def getpass(self, *msg, args: tuple = (), end: str = '', **kwargs) -> str:
@@ -194,10 +353,271 @@ class Logger(_logging.Logger):
         :param end: The ending character to append to the message.
         :return: The password.
         """
-        msg = ' '.join([str(m) for m in msg]) + end
-        self._log(self.level if self.level >= NOTSET else NOTSET, msg, args, **kwargs)
+        self._log(
+            self.level if self.level >= NOTSET else NOTSET, _make_message(msg, end),
+            args, **kwargs
+        )
         return _getpass('')
 
+    def log_many(
+        self,
+        level: int,
+        messages: _Iterable[_Any],
+        args: tuple = (),
+        end: str = '\n',
+        **kwargs
+    ) -> None:
+        """Log each of the messages with the integer severity 'level'.
+
+        The level is checked once and the handlers that define `handle_batch` receive
+        all the records together, so they can write them at once.
+
+        logger.log_many(level, ("first item: %s", "second item: %s"), args=(21, ))
+        """
+        if not isinstance(level, int):
+            if _raiseExceptions:
+                raise TypeError('level must be an integer')
+            return
+        if self.isEnabledFor(level):
+            self._log_many(
+                level, [_make_message((m, ), end) for m in messages], args, **kwargs
+            )
+
+    def debug_many(
+        self, messages: _Iterable[_Any], args: tuple = (), end: str = '\n', **kwargs
+    ) -> None:
+        """Log each of the messages with severity 'DEBUG'."""
+        if self._level_table[DEBUG]:
+            self._log_many(
+                DEBUG, [_make_message((m, ), end) for m in messages], args, **kwargs
+            )
+
+    def info_many(
+        self, messages: _Iterable[_Any], args: tuple = (), end: str = '\n', **kwargs
+    ) -> None:
+        """Log each of the messages with severity 'INFO'."""
+        if self._level_table[INFO]:
+            self._log_many(
+                INFO, [_make_message((m, ), end) for m in messages], args, **kwargs
+            )
+
+    def warning_many(
+        self, messages: _Iterable[_Any], args: tuple = (), end: str = '\n', **kwargs
+    ) -> None:
+        """Log each of the messages with severity 'WARNING'."""
+        if self._level_table[WARNING]:
+            self._log_many(
+                WARNING, [_make_message((m, ), end) for m in messages], args, **kwargs
+            )
+
+    def error_many(
+        self, messages: _Iterable[_Any], args: tuple = (), end: str = '\n', **kwargs
+    ) -> None:
+        """Log each of the messages with severity 'ERROR'."""
+        if self._level_table[ERROR]:
+            self._log_many(
+                ERROR, [_make_message((m, ), end) for m in messages], args, **kwargs
+            )
+
+    def critical_many(
+        self, messages: _Iterable[_Any], args: tuple = (), end: str = '\n', **kwargs
+    ) -> None:
+        """Log each of the messages with severity 'CRITICAL'."""
+        if self._level_table[CRITICAL]:
+            self._log_many(
+                CRITICAL, [_make_message((m, ), end) for m in messages], args, **kwargs
+            )
+
+    def print_many(
+        self, messages: _Iterable[_Any], args: tuple = (), end: str = '\n', **kwargs
+    ) -> None:
+        """Log each of the messages with severity 'PRINT'."""
+        self._log_many(
+            PRINT, [_make_message((m, ), end) for m in messages], args, **kwargs
+        )
+
+    def _make_records(
+        self,
+        level: int,
+        msgs: _Sequence[_Any],
+        args: tuple,
+        exc_info=None,  # noqa: ANN001
+        extra: _Optional[Mapping[str, object]] = None,
+        stack_info: bool = False,
+        stacklevel: int = 1
+    ) -> List[_logging.LogRecord]:
+        """Create a LogRecord for each message, looking the caller up only once."""
+        sinfo = None
+        if _logging._srcfile:  # noqa: SLF001
+            # The caller is the same for all the records, so it is only looked up once
+            try:
+                # `findCaller` skips the frames of this module, so the stacklevel of
+                # the caller is passed as it is
+                file_name, line_number, func, sinfo = self.findCaller(
+                    stack_info, stacklevel
+                )
+            except ValueError:
+                file_name, line_number, func = '(unknown file)', 0, '(unknown function)'
+        else:
+            file_name, line_number, func = '(unknown file)', 0, '(unknown function)'
+        if exc_info:
+            if isinstance(exc_info, BaseException):
+                exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+            elif not isinstance(exc_info, tuple):
+                exc_info = _sys.exc_info()
+        return [
+            self.makeRecord(
+                self.name, level, file_name, line_number, msg, args, exc_info, func,
+                extra, sinfo
+            ) for msg in msgs
+        ]
+
+    def _log_many(
+        self,
+        level: int,
+        msgs: _Sequence[_Any],
+        args: tuple,
+        exc_info=None,  # noqa: ANN001
+        extra: _Optional[Mapping[str, object]] = None,
+        stack_info: bool = False,
+        stacklevel: int = 1
+    ) -> None:
+        """Low-level batch logging routine which creates a LogRecord for each message
+        and then calls the handlers of this logger to handle them all at once."""
+        self.handle_batch(
+            self._make_records(
+                level, msgs, args, exc_info, extra, stack_info, stacklevel
+            )
+        )
+
+    def handle_batch(self, records: _Sequence[_logging.LogRecord]) -> None:
+        """Call the handlers for the records that pass the filters of this logger.
+
+        Handlers that define `handle_batch` get all the records in a single call and
+        the rest get them one by one through `handle`.
+
+        :param records: The records to handle. They must all have the same level.
+        """
+        if self.disabled or not records:
+            return
+        if self.filters:
+            records = [record for record in records if self.filter(record)]
+            if not records:
+                return
+        level = records[0].levelno
+        found = 0
+        logger = self
+        while logger:
+            for handler in logger.handlers:
+                found += 1
+                if level >= handler.level:
+                    handle_batch = getattr(handler, 'handle_batch', None)
+                    if handle_batch is not None:
+                        handle_batch(records)
+                    else:
+                        for record in records:
+                            handler.handle(record)
+            logger = logger.parent if logger.propagate else None
+        if found == 0:
+            for record in records:
+                # Lets the standard library deal with the lack of handlers
+                self.callHandlers(record)
+
+    async def alog(
+        self, level: int, *msg, args: tuple = (), end: str = '\n', **kwargs
+    ) -> None:
+        """Log 'msg % args' with the integer severity 'level' without blocking the
+        event loop on handlers that support it.
+
+        await logger.alog(level, "We have a %s", args=("mysterious problem",))
+        """
+        if not isinstance(level, int):
+            if _raiseExceptions:
+                raise TypeError('level must be an integer')
+            return
+        if self.isEnabledFor(level):
+            await self._alog(level, _make_message(msg, end), args, **kwargs)
+
+    async def adebug(self, *msg, args: tuple = (), end: str = '\n', **kwargs) -> None:
+        """Log 'msg % args' with severity 'DEBUG' without blocking the event loop."""
+        if self._level_table[DEBUG]:
+            await self._alog(DEBUG, _make_message(msg, end), args, **kwargs)
+
+    async def ainfo(self, *msg, args: tuple = (), end: str = '\n', **kwargs) -> None:
+        """Log 'msg % args' with severity 'INFO' without blocking the event loop."""
+        if self._level_table[INFO]:
+            await self._alog(INFO, _make_message(msg, end), args, **kwargs)
+
+    async def awarning(
+        self, *msg, args: tuple = (), end: str = '\n', **kwargs
+    ) -> None:
+        """Log 'msg % args' with severity 'WARNING' without blocking the event loop."""
+        if self._level_table[WARNING]:
+            await self._alog(WARNING, _make_message(msg, end), args, **kwargs)
+
+    async def aerror(self, *msg, args: tuple = (), end: str = '\n', **kwargs) -> None:
+        """Log 'msg % args' with severity 'ERROR' without blocking the event loop."""
+        if self._level_table[ERROR]:
+            await self._alog(ERROR, _make_message(msg, end), args, **kwargs)
+
+    async def aexception(
+        self, *msg, args: tuple = (), exc_info: bool = True, **kwargs
+    ) -> None:
+        """Log 'msg % args' with severity 'ERROR' and the exception information without
+        blocking the event loop."""
+        await self.aerror(*msg, args=args, exc_info=exc_info, **kwargs)
+
+    async def acritical(
+        self, *msg, args: tuple = (), end: str = '\n', **kwargs
+    ) -> None:
+        """Log 'msg % args' with severity 'CRITICAL' without blocking the event
+        loop."""
+        if self._level_table[CRITICAL]:
+            await self._alog(CRITICAL, _make_message(msg, end), args, **kwargs)
+
+    async def _alog(
+        self,
+        level: int,
+        msg,  # noqa: ANN001
+        args: tuple,
+        exc_info=None,  # noqa: ANN001
+        extra: _Optional[Mapping[str, object]] = None,
+        stack_info: bool = False,
+        stacklevel: int = 1
+    ) -> None:
+        """Low-level asynchronous logging routine which creates a LogRecord and then
+        awaits the handlers of this logger."""
+        record, = self._make_records(
+            level, (msg, ), args, exc_info, extra, stack_info, stacklevel
+        )
+        await self.ahandle(record)
+
+    async def ahandle(self, record: _logging.LogRecord) -> None:
+        """Call the handlers for the record if it passes the filters of this logger.
+
+        The handlers that define an `ahandle` coroutine method are awaited, the rest
+        are called through `handle`.
+
+        :param record: The record to handle.
+        """
+        if self.disabled or not self.filter(record):
+            return
+        found = 0
+        logger = self
+        while logger:
+            for handler in logger.handlers:
+                found += 1
+                if record.levelno >= handler.level:
+                    ahandle = getattr(handler, 'ahandle', None)
+                    if ahandle is not None:
+                        await ahandle(record)
+                    else:
+                        handler.handle(record)
+            logger = logger.parent if logger.propagate else None
+        if found == 0:
+            # Lets the standard library deal with the lack of handlers
+            self.callHandlers(record)
+
     def print_progress(self, progress: float, total: float, **kwargs) -> None:
         """Log progress."""
         self.progress_bar(progress, total, **kwargs)
@@ -286,12 +706,12 @@ class Logger(_logging.Logger):
             if errors == 'handle':
                 return self.add_level(level, _add_one(name), errors)
 
-        def log_for_level(
-            self: Logger, *msg, args: tuple = (), end: str = '\n', **kwargs
-        ) -> None:
-            self.log(level, *msg, args=args, end=end, **kwargs)
-
-        setattr(self, name, _MethodType(log_for_level, self))
+        # The functions are shared between the loggers; each logger only keeps the
+        # bound methods of its own levels
+        levels = dict(self._custom_levels)
+        levels[name] = level
+        self._custom_levels = levels
+        setattr(self, name, _MethodType(_level_method(level, name), self))
         return name
 
     def add_levels(
@@ -412,6 +832,33 @@ class Logger(_logging.Logger):
         return self
 
 
+@_lru_cache(maxsize=None)
+def _level_method(level: int, name: str) -> _Callable:
+    """Generate the method of a custom level once per level and name.
+
+    :param level: The level of the method.
+    :param name: The name of the method.
+    :return: A function to be used as a Logger method.
+    """
+    if isinstance(level, int) and NOTSET <= level <= INPUT:
+
+        def log_for_level(
+            self: Logger, *msg, args: tuple = (), end: str = '\n', **kwargs
+        ) -> None:
+            if self._level_table[level]:
+                self._log(level, _make_message(msg, end), args, **kwargs)
+    else:
+
+        def log_for_level(
+            self: Logger, *msg, args: tuple = (), end: str = '\n', **kwargs
+        ) -> None:
+            self.log(level, *msg, args=args, end=end, **kwargs)
+
+    log_for_level.__name__ = log_for_level.__qualname__ = name
+    log_for_level.__doc__ = f"Log 'msg % args' with severity {level!r}."
+    return log_for_level
+
+
 def _add_one(name: str) -> str:
     """Add one to the end of a string.
 
@@ -117,6 +117,9 @@ class LoggingWindowHandler(_StreamHandler):
         except Exception:  # pylint: disable=broad-except
             self.handleError(record)
 
+    def _write_text(self, text: str) -> None:
+        self.write(text)
+
     def write(self, message: str) -> None:  # pylint: disable=too-many-branches
         """Write a message to the LoggingWindow.
 
@@ -355,6 +358,7 @@ class LoggingWindow(_Logger):  # pylint: disable=too-many-instance-attributes
         self.window.bind('<<show>>', self.__show)
         self.window.bind('<<clear>>', self.__clear)
         self.window.bind('<<log>>', self.__log)
+        self.window.bind('<<log many>>', self.__log_many)
         self.window.bind('<<input>>', self.__input)
         self.window.bind('<<type input>>', self.__type_input)
         self.window.bind('<<getpass>>', self.__getpass)
@@ -399,6 +403,18 @@ class LoggingWindow(_Logger):  # pylint: disable=too-many-instance-attributes
             data.stacklevel
         )
 
+    def __log_many(self, event) -> None:  # noqa: ANN001
+        data = event.data
+        if self.getting_input_status == GettingInputStatus.GETTING_INPUT:
+            raise RuntimeError(
+                'Cannot log while getting input from the user! '
+                'Please cancel the input first.'
+            )
+        super()._log_many(
+            data.level, data.msgs, data.args, data.exc_info, data.extra,
+            data.stack_info, data.stacklevel
+        )
+
     def __input(self, event) -> None:  # noqa: ANN001
         data = event.data
         msg = ' '.join([str(m) for m in data.msg]) + data.end
@@ -512,6 +528,32 @@ class LoggingWindow(_Logger):  # pylint: disable=too-many-instance-attributes
         )
         _lock.release()
 
+    def _log_many(
+        self,
+        level: int,
+        msgs: list,
+        args: tuple,
+        exc_info: _Optional[bool] = None,
+        extra=None,  # noqa: ANN001
+        stack_info: bool = False,
+        stacklevel: int = 1
+    ) -> None:
+        _lock.acquire()
+        self.window.event_generate(
+            '<<log many>>',
+            when='tail',
+            data=_Namespace(
+                level=level,
+                msgs=msgs,
+                args=args,
+                exc_info=exc_info,
+                extra=extra,
+                stack_info=stack_info,
+                stacklevel=stacklevel
+            )
+        )
+        _lock.release()
+
     def input(
         self,
         *msg,
@@ -5,9 +5,10 @@ import logging as _logging
 from typing import Union as _Union
 
 from log21.levels import INFO as _INFO
-from log21.logger import Logger as _loggerClass
+from log21.logger import Logger as _loggerClass, _LevelCache
 
 root = _logging.RootLogger(_INFO)
+root._cache = _LevelCache()  # noqa: SLF001
 
 LoggingType = _Union[_loggerClass, _logging.Logger]
 
@@ -21,12 +22,23 @@ class Manager(_logging.Manager):
 
     def __init__(self) -> None:
         self.root = root
+        self.loggerDict = {}
         self.disable = 0
         self.emittedNoHandlerWarning = False
-        self.loggerDict = {}
         self.loggerClass = None
         self.logRecordFactory = None
 
+    @property
+    def disable(self) -> int:
+        """Disables all the logging calls of this level and below."""
+        return self._disable
+
+    @disable.setter
+    def disable(self, value: int) -> None:
+        self._disable = value
+        # Makes the loggers rebuild their enabled-level tables
+        self._clear_cache()
+
     def getLogger(  # ty: ignore[invalid-method-override]
         self, name: str
     ) -> _Union[LoggingType, None]:
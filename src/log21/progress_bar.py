@@ -6,12 +6,12 @@
 from __future__ import annotations
 
 import sys as _sys
-import shutil as _shutil
 from typing import (TYPE_CHECKING as _TYPE_CHECKING, Any as _Any, Mapping as _Mapping,
                     Optional as _Optional)
 
 from log21.colors import get_colors as _gc
 from log21.logger import Logger as _Logger
+from log21.terminal import get_terminal_size as _get_terminal_size
 from log21.stream_handler import ColorizingStreamHandler as _ColorizingStreamHandler
 
 from ._module_helper import FakeModule as _FakeModule
@@ -29,6 +29,11 @@ _logger.addHandler(_ColorizingStreamHandler())
 __all__ = ['ProgressBar']
 
 
+def _terminal_width() -> int:
+    width = _get_terminal_size().columns - 1
+    return width if width >= 1 else 50
+
+
 class ProgressBar:  # pylint: disable=too-many-instance-attributes, line-too-long
     """
     Usage Example:
@@ -88,14 +93,7 @@ class ProgressBar:  # pylint: disable=too-many-instance-attributes, line-too-lon
         :param additional_variables: Additional variables to use in the format and their
             default values
         """
-        # Sets a default value for the width
-        if width is None:
-            try:
-                width = _shutil.get_terminal_size().columns - 1
-            except OSError:
-                width = 50
-            if width < 1:
-                width = 50
+        # None makes the width follow the width of the terminal
         self.width = width
         if self.width < 3:
             raise ValueError('`width` must be greater than 1')
@@ -170,6 +168,18 @@ class ProgressBar:  # pylint: disable=too-many-instance-attributes, line-too-lon
         self.additional_variables = additional_variables
         self.i = 0
 
+    @property
+    def width(self) -> int:
+        """The width of the progress bar; the width of the terminal (minus one) if no
+        width was given."""
+        if self._width is None:
+            return _terminal_width()
+        return self._width
+
+    @width.setter
+    def width(self, width: _Optional[int]) -> None:
+        self._width = width
+
     def get_bar(self, progress: float, total: float, **kwargs) -> str:
         """Return the progress bar as a string.
 
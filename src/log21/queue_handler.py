@@ -0,0 +1,542 @@
+# log21.queue_handler.py
+# CodeWriter21
+
+# yapf: disable
+
+import copy as _copy
+import time as _time
+import queue as _queue
+import atexit as _atexit
+import random as _random
+import threading as _threading
+from typing import (Any as _Any, Dict as _Dict, List as _List, Literal as _Literal,
+                    Mapping as _Mapping, Optional as _Optional)
+from weakref import WeakSet as _WeakSet
+from logging import (Handler as _Handler, LogRecord as _LogRecord,
+                     getLevelName as _getLevelName, makeLogRecord as _makeLogRecord)
+from collections import deque as _deque
+from logging.handlers import (QueueHandler as _QueueHandler,
+                              QueueListener as _QueueListener)
+
+from log21.levels import INFO, DEBUG, ERROR, WARNING
+from log21.logger import LazyMessage as _LazyMessage
+
+# yapf: enable
+
+__all__ = ['QueueHandler', 'QueueListener', 'OverloadQueue', 'make_async']
+
+# ruff: noqa: ANN001
+
+# Arguments of these types can't change after the record is made, so they can travel
+# to the listener thread as they are
+_IMMUTABLE_TYPES = (str, int, float, complex, bool, bytes, type(None))
+
+
+def _is_immutable(values) -> bool:
+    return all(isinstance(value, _IMMUTABLE_TYPES) for value in values)
+
+
+class QueueHandler(_QueueHandler):
+    """A handler that puts the records in a queue for a QueueListener to handle.
+
+    The thread that logs only pays for copying the record and putting it in the queue;
+    the formatting and the writing are done by the listener's thread.
+    """
+
+    def __init__(self, queue, listener: _Optional['QueueListener'] = None) -> None:
+        """Initialize the handler.
+
+        :param queue: The queue to put the records in.
+        :param listener: The listener that handles the records of the queue. It is
+            stopped and its handlers are closed when the handler is closed.
+        """
+        super().__init__(queue)
+        self.listener = listener
+        self.enqueued = 0
+        self.max_depth = 0
+        self._stats_lock = _threading.Lock()
+
+    @property
+    def depth(self) -> int:
+        """The number of records that are waiting in the queue."""
+        try:
+            return self.queue.qsize()
+        except NotImplementedError:
+            return 0
+
+    def stats(self) -> _Dict[str, int]:
+        """Return the statistics of the queue.
+
+        :return: A dictionary with the number of records that the queue has accepted,
+            the current depth of the queue and the maximum depth it has reached, along
+            with the statistics of the queue itself if it has any (e.g. OverloadQueue).
+        """
+        stats = {
+            'enqueued': self.enqueued,
+            'depth': self.depth,
+            'max_depth': self.max_depth
+        }
+        queue_stats = getattr(self.queue, 'stats', None)
+        if queue_stats is not None:
+            stats.update(queue_stats())
+        return stats
+
+    def prepare(self, record) -> _LogRecord:
+        """Return a copy of the record that is safe to handle in another thread.
+
+        Unlike `logging.handlers.QueueHandler.prepare`, the record is not formatted
+        here. Only the arguments that may change before the listener gets to the record
+        are merged into the message.
+
+        :param record: The record to prepare.
+        :return: The prepared record.
+        """
+        record = _copy.copy(record)
+        msg = record.msg
+        if isinstance(msg, _LazyMessage) and not _is_immutable(msg.parts):
+            record.msg = str(msg)
+        if record.args and (
+            not isinstance(record.args, tuple) or not _is_immutable(record.args)
+        ):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def handle(self, record) -> bool:
+        """Put the record in the queue if it passes the filters of the handler.
+
+        The queue is thread-safe, so the lock of the handler is not held: a queue that
+        makes a thread wait for room (e.g. OverloadQueue with `policy='block'`) doesn't
+        make the other threads wait behind it.
+
+        :param record: The record to handle.
+        :return: The result of the filters.
+        """
+        result = self.filter(record)
+        if isinstance(result, _LogRecord):
+            record = result
+        if result:
+            self.emit(record)
+        return result
+
+    def enqueue(self, record) -> None:
+        """Put the record in the queue and update the statistics."""
+        # OverloadQueue tells whether it accepted the record; queue.Queue always does
+        if self.queue.put_nowait(record) is False:
+            return
+        depth = self.depth
+        with self._stats_lock:
+            self.enqueued += 1
+            if depth > self.max_depth:
+                self.max_depth = depth
+
+    def handle_batch(self, records) -> None:
+        """Enqueue several records; like `handle`, without the lock of the handler.
+
+        :param records: The records to enqueue.
+        """
+        for record in records:
+            if self.filter(record):
+                try:
+                    self.enqueue(self.prepare(record))
+                except Exception:  # pylint: disable=broad-except
+                    self.handleError(record)
+
+    def close(self) -> None:
+        """Stop the listener, after it handles the queued records, and close the
+        handlers."""
+        if self.listener is not None:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+        super().close()
+
+
+class QueueListener(_QueueListener):
+    """A QueueListener that takes every record that is waiting in the queue at once and
+    passes them to the handlers in a batch."""
+
+    def __init__(
+        self,
+        queue,
+        *handlers: _Handler,
+        respect_handler_level: bool = True,
+        batch_size: int = 256
+    ) -> None:
+        """Initialize the listener.
+
+        :param queue: The queue to take the records from.
+        :param handlers: The handlers that handle the records.
+        :param respect_handler_level: Whether to skip the records with a level lower
+            than the level of a handler.
+        :param batch_size: The maximum number of records to handle at once.
+        """
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.batch_size = batch_size
+        self._lock = _threading.Lock()
+
+    def start(self) -> None:
+        """Start the thread that handles the records."""
+        with self._lock:
+            if self._thread is None:
+                super().start()
+                _listeners.add(self)
+
+    def stop(self) -> None:
+        """Handle the records left in the queue and stop the thread.
+
+        Stopping a listener that is not running does nothing.
+        """
+        with self._lock:
+            if self._thread is not None:
+                super().stop()
+                _listeners.discard(self)
+
+    def _take(self) -> _List[_Any]:
+        """Wait for a record and take the records that are waiting after it."""
+        items = [self.dequeue(True)]
+        while len(items) < self.batch_size and items[-1] is not self._sentinel:
+            try:
+                items.append(self.dequeue(False))
+            except _queue.Empty:
+                break
+        return items
+
+    def _monitor(self) -> None:
+        has_task_done = hasattr(self.queue, 'task_done')
+        while True:
+            items = self._take()
+            stop = items[-1] is self._sentinel
+            records = items[:-1] if stop else items
+            if records:
+                self.handle_batch([self.prepare(record) for record in records])
+            if has_task_done:
+                for _ in items:
+                    self.queue.task_done()
+            if stop:
+                break
+
+    def handle_batch(self, records: _List[_LogRecord]) -> None:
+        """Pass the records to the handlers.
+
+        Handlers that define `handle_batch` get their records in one call.
+
+        :param records: The records to handle.
+        """
+        for handler in self.handlers:
+            if self.respect_handler_level:
+                accepted = [
+                    record for record in records if record.levelno >= handler.level
+                ]
+            else:
+                accepted = records
+            if not accepted:
+                continue
+            handle_batch = getattr(handler, 'handle_batch', None)
+            if handle_batch is not None:
+                handle_batch(accepted)
+            else:
+                for record in accepted:
+                    handler.handle(record)
+
+
+class OverloadQueue:  # pylint: disable=too-many-instance-attributes
+    """A bounded queue for QueueHandler that decides what to do with the records when
+    the listener can't keep up.
+
+    The records are kept in one lane per level and handed out in the order they were
+    put in. Records with a level of at least `priority_level` go to a priority lane.
+    By default it is not bounded: its records never wait and are never dropped, so a
+    flood of them can grow the queue past `maxsize`. With `priority_maxsize` it is
+    bounded too, and a record that finds it full waits (with the 'block' policy) or is
+    dropped (with the 'drop' policy). For the rest:
+
+    * `policy='block'` makes the logging thread wait for free space, for up to
+      `block_timeout` seconds when it is given, after which the record is dropped.
+    * `policy='drop'` makes room by dropping the oldest record of the lowest level that
+      is lower than the level of the new record, or drops the new record if there is
+      no such record.
+
+    When the queue is filled beyond `sample_threshold`, the records of the levels in
+    `sample_rates` are only accepted with the given probability.
+
+    The listener receives a WARNING record that tells how many records were dropped
+    since the previous one, at most once every `summary_interval` seconds and whenever
+    the queue runs empty.
+
+    >>> import log21
+    >>> from log21.queue_handler import OverloadQueue
+    >>>
+    >>> logger = log21.get_logger('Busy', async_=OverloadQueue(maxsize=1000))
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        policy: _Literal['block', 'drop'] = 'drop',
+        priority_level: int = ERROR,
+        sample_rates: _Optional[_Mapping[int, float]] = None,
+        sample_threshold: float = 0.5,
+        block_timeout: _Optional[float] = None,
+        summary_interval: float = 1.0,
+        summary_name: str = 'log21.queue',
+        priority_maxsize: _Optional[int] = None
+    ) -> None:
+        """Initialize the queue.
+
+        :param maxsize: The maximum number of records below `priority_level` to keep.
+        :param policy: What to do when the queue is full: 'block' or 'drop'.
+        :param priority_level: The lowest level of the records that are never dropped.
+        :param sample_rates: A mapping of levels to the chance of a record of that
+            level to be accepted when the queue is under pressure. Defaults to
+            {DEBUG: 0.1, INFO: 0.5}.
+        :param sample_threshold: The fraction of `maxsize` beyond which the records are
+            sampled.
+        :param block_timeout: The maximum number of seconds to wait for free space with
+            the 'block' policy. None means to wait as long as it takes.
+        :param summary_interval: The minimum number of seconds between two summaries of
+            the dropped records.
+        :param summary_name: The logger name of the summary records.
+        :param priority_maxsize: The maximum number of records of at least
+            `priority_level` to keep. None means no limit.
+        """
+        if policy not in ('block', 'drop'):
+            raise ValueError("`policy` must be one of: 'block', 'drop'")
+        if maxsize <= 0:
+            raise ValueError('`maxsize` must be a positive integer')
+        if priority_maxsize is not None and priority_maxsize <= 0:
+            raise ValueError('`priority_maxsize` must be a positive integer or None')
+        self.maxsize = maxsize
+        self.policy = policy
+        self.priority_level = priority_level
+        self.sample_rates: _Dict[int, float] = dict(
+            {DEBUG: 0.1, INFO: 0.5} if sample_rates is None else sample_rates
+        )
+        self.sample_threshold = sample_threshold
+        self.block_timeout = block_timeout
+        self.summary_interval = summary_interval
+        self.summary_name = summary_name
+        self.priority_maxsize = priority_maxsize
+
+        self._lanes: _Dict[int, _deque] = {}
+        self._priority: _deque = _deque()
+        self._size = 0  # The number of records in the bounded lanes
+        self._sequence = 0
+        # The dropped records per level: since the start and since the last summary
+        self._dropped: _Dict[int, int] = {}
+        self._unreported: _Dict[int, int] = {}
+        self._last_summary = _time.monotonic()
+        self.dropped = 0
+        self.sampled = 0
+        self.rejected = 0
+        self.evicted = 0
+        self.processed = 0
+
+        self._mutex = _threading.Lock()
+        self._not_empty = _threading.Condition(self._mutex)
+        self._not_full = _threading.Condition(self._mutex)
+        self._priority_not_full = _threading.Condition(self._mutex)
+
+    def qsize(self) -> int:
+        """Return the number of records in the queue."""
+        with self._mutex:
+            return self._size + len(self._priority)
+
+    def empty(self) -> bool:
+        """Return True if the queue is empty."""
+        return self.qsize() == 0
+
+    def stats(self) -> _Dict[str, _Any]:
+        """Return the number of the processed and the dropped records.
+
+        The records that are dropped are either rejected by `put` (which tells the
+        QueueHandler not to count them as enqueued) or evicted from the queue to make
+        room, so the numbers add up: `enqueued == processed + depth + evicted`.
+
+        :return: A dictionary with the number of records handed to the listener, the
+            total number of dropped records, how many of them were rejected, evicted
+            and sampled out, and the number of dropped records per level name.
+        """
+        with self._mutex:
+            return {
+                'processed': self.processed,
+                'dropped': self.dropped,
+                'rejected': self.rejected,
+                'evicted': self.evicted,
+                'sampled': self.sampled,
+                'dropped_by_level': {
+                    _getLevelName(level): count
+                    for level, count in sorted(self._dropped.items())
+                }
+            }
+
+    def _drop(self, level: int) -> None:
+        self.dropped += 1
+        self._dropped[level] = self._dropped.get(level, 0) + 1
+        self._unreported[level] = self._unreported.get(level, 0) + 1
+
+    def _reject(self, level: int) -> bool:
+        self.rejected += 1
+        self._drop(level)
+        return False
+
+    def _append(self, lane: _deque, item) -> None:
+        self._sequence += 1
+        lane.append((self._sequence, item))
+        self._not_empty.notify()
+
+    def _make_room(self, level: int) -> bool:
+        """Drop the oldest record of the lowest level lower than `level`.
+
+        :return: True if a record was dropped.
+        """
+        lower = [
+            lane_level for lane_level, lane in self._lanes.items()
+            if lane and lane_level < level
+        ]
+        if not lower:
+            return False
+        lowest = min(lower)
+        self._lanes[lowest].popleft()
+        self._size -= 1
+        self.evicted += 1
+        self._drop(lowest)
+        return True
+
+    def put(self, item, block: bool = True, timeout: _Optional[float] = None) -> bool:
+        """Put a record in the queue, following the overload policy.
+
+        `block` and `timeout` are accepted for compatibility with `queue.Queue`; the
+        policy of the queue decides whether putting waits.
+
+        :param item: The record, or the sentinel of a QueueListener.
+        :return: False if the record was dropped instead of being put in the queue.
+        """
+        level = getattr(item, 'levelno', None)
+        with self._mutex:
+            # The sentinel of QueueListener always gets in
+            if not isinstance(level, int):
+                self._append(self._priority, item)
+                return True
+            if level >= self.priority_level:
+                limit = self.priority_maxsize
+                if limit is not None and len(self._priority) >= limit and (
+                    self.policy == 'drop' or not self._priority_not_full.wait_for(
+                        lambda: len(self._priority) < limit, self.block_timeout
+                    )
+                ):
+                    return self._reject(level)
+                self._append(self._priority, item)
+                return True
+            if (
+                level in self.sample_rates
+                and self._size >= self.sample_threshold * self.maxsize
+                and _random.random() >= self.sample_rates[level]
+            ):
+                self.sampled += 1
+                return self._reject(level)
+            if self._size >= self.maxsize:
+                if self.policy == 'block':
+                    if not self._not_full.wait_for(
+                            lambda: self._size < self.maxsize, self.block_timeout):
+                        return self._reject(level)
+                elif not self._make_room(level):
+                    return self._reject(level)
+            lane = self._lanes.get(level)
+            if lane is None:
+                lane = self._lanes[level] = _deque()
+            self._append(lane, item)
+            self._size += 1
+            return True
+
+    def put_nowait(self, item) -> bool:
+        """Put a record in the queue, following the overload policy."""
+        return self.put(item, False)
+
+    def _summary(self) -> _LogRecord:
+        """Make a WARNING record that tells how many records have been dropped since the
+        last summary."""
+        total = sum(self._unreported.values())
+        details = ', '.join(
+            f'{_getLevelName(level)}: {count}'
+            for level, count in sorted(self._unreported.items())
+        )
+        self._unreported.clear()
+        self._last_summary = _time.monotonic()
+        return _makeLogRecord({
+            'name': self.summary_name,
+            'levelno': WARNING,
+            'levelname': _getLevelName(WARNING),
+            'msg': '%d log records were dropped (%s)\n',
+            'args': (total, details)
+        })
+
+    def _pop(self) -> _Any:
+        """Remove and return the oldest item of all the lanes."""
+        oldest = self._priority if self._priority else None
+        for lane in self._lanes.values():
+            if lane and (oldest is None or lane[0][0] < oldest[0][0]):
+                oldest = lane
+        if oldest is None:
+            raise _queue.Empty
+        if oldest is self._priority:
+            self._priority_not_full.notify()
+        else:
+            self._size -= 1
+            self._not_full.notify()
+        item = oldest.popleft()[1]
+        if isinstance(item, _LogRecord):
+            self.processed += 1
+        return item
+
+    def get(self, block: bool = True, timeout: _Optional[float] = None) -> _Any:
+        """Remove and return the oldest record, or a summary of the dropped records.
+
+        :param block: Whether to wait for a record when the queue is empty.
+        :param timeout: The maximum number of seconds to wait.
+        :raises queue.Empty: If no record is available.
+        """
+        with self._mutex:
+            empty = self._size == 0 and not self._priority
+            if self._unreported and (
+                empty or
+                _time.monotonic() - self._last_summary >= self.summary_interval
+            ):
+                return self._summary()
+            if empty and block:
+                self._not_empty.wait_for(
+                    lambda: self._size or self._priority or self._unreported, timeout
+                )
+                if self._size == 0 and not self._priority and self._unreported:
+                    return self._summary()
+            return self._pop()
+
+    def get_nowait(self) -> _Any:
+        """Remove and return the oldest record without waiting."""
+        return self.get(False)
+
+
+# The listeners that are running; they are stopped before the interpreter exits so
+# that no queued record is lost
+_listeners: '_WeakSet[QueueListener]' = _WeakSet()
+
+
+@_atexit.register
+def _stop_listeners() -> None:
+    for listener in list(_listeners):
+        listener.stop()
+
+
+def make_async(*handlers: _Handler, queue=None) -> QueueHandler:
+    """Move the handlers behind a queue that is handled by a background thread.
+
+    :param handlers: The handlers that the listener thread will own.
+    :param queue: The queue to use. A `queue.SimpleQueue` is used when it is None.
+    :return: A started QueueHandler to add to the logger instead of the handlers.
+    """
+    if queue is None:
+        queue = _queue.SimpleQueue()
+    listener = QueueListener(queue, *handlers)
+    handler = QueueHandler(queue, listener)
+    listener.start()
+    return handler
@@ -5,22 +5,38 @@
 
 import os as _os
 import re as _re
-import shutil as _shutil
-from typing import Optional as _Optional
+import asyncio as _asyncio
+from typing import Dict as _Dict, List as _List, Optional as _Optional
 from logging import StreamHandler as _StreamHandler
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
 
-from log21.colors import (get_colors as _gc, hex_escape as _hex_escape,
-                          ansi_escape as _ansi_escape)
+from log21.colors import (get_colors as _gc, ansi_escape as _ansi_escape,
+                          strip_escapes as _strip_escapes,
+                          supports_color as _supports_color)
+from log21.levels import ERROR
+from log21.logger import LazyMessage as _LazyMessage
+from log21._raw_io import (RawWriter as _RawWriter, open_raw_writer as _open_raw_writer,
+                           open_non_blocking_writer as _open_non_blocking_writer,
+                           reopen as _reopen)
+from log21._flusher import PeriodicFlusher as _PeriodicFlusher
+from log21.formatters import ColorizingFormatter as _ColorizingFormatter
+from log21.terminal import get_terminal_size as _get_terminal_size
 
 # yapf: enable
 
-__all__ = ['IS_WINDOWS', 'ColorizingStreamHandler', 'StreamHandler']
+__all__ = [
+    'IS_WINDOWS', 'ColorizingStreamHandler', 'StreamHandler',
+    'AsyncColorizingStreamHandler'
+]
 
 IS_WINDOWS = _os.name == 'nt'
 
 if IS_WINDOWS:
     import ctypes
 
+# Splits a text around its SGR escape sequences
+_sgr_split = _re.compile(r'(\x1b\[(?:\d+(?:;(?:\d+))*)m)')
+
 # ruff: noqa: ANN001
 
 
@@ -52,39 +68,107 @@ class StreamHandler(_StreamHandler):
         if level is not None:
             self.setLevel(level)
 
+    # The stream that `_console_fd` was found for
+    _console_stream = None
+    _console_fd: _Optional[int] = None
+
+    def _get_console_fd(self) -> _Optional[int]:
+        """Return the file descriptor of the stream if it is the standard output or
+        error, or None.
+
+        It is found once per stream, so replacing the stream (with `setStream` or not)
+        is noticed.
+        """
+        stream = self.stream
+        if stream is not self._console_stream:
+            try:
+                file_descriptor = stream.fileno()
+            except (AttributeError, ValueError, OSError):
+                # Streams without a file descriptor (e.g. io.StringIO)
+                file_descriptor = None
+            self._console_fd = file_descriptor if file_descriptor in (1, 2) else None
+            self._console_stream = stream
+        return self._console_fd
+
+    def _cr_prefix(self, record) -> str:
+        """Handle a carriage return at the beginning of the record.
+
+        :return: The text that clears the current line if it is needed.
+        """
+        msg = record.msg
+        if isinstance(msg, _LazyMessage):
+            # The record keeps the LazyMessage for the other handlers (e.g. to keep
+            # its parts apart); the joined text is memoized
+            msg = str(msg)
+        # Most of the messages don't contain any carriage return
+        if not isinstance(msg, str) or '\r' not in msg:
+            return ''
+        visible = _strip_escapes(msg.strip(' \t\n\x0b\x0c'))
+        if visible[:1] != '\r':
+            return ''
+        file_descriptor = self._get_console_fd()
+        if file_descriptor is None:
+            return ''
+        index = msg.rfind('\r')
+        record.msg = _gc(*_sgr_split.split(msg[:index])) + msg[index + 1:]
+        return '\r' + (' ' * (_get_terminal_size(file_descriptor).columns - 1)) + '\r'
+
+    def _nl_prefix(self, record) -> str:
+        """Move the new lines at the beginning of the record out of it.
+
+        :return: The new lines to write before the record.
+        """
+        msg = record.msg
+        if isinstance(msg, _LazyMessage):
+            msg = str(msg)
+        if (
+            not isinstance(msg, str) or msg[:1] != '\n'
+            or self._get_console_fd() is None
+        ):
+            return ''
+        record.msg = msg.lstrip('\n')
+        return '\n' * (len(msg) - len(record.msg))
+
     def check_cr(self, record) -> None:
         """Check if the record contains a carriage return and handle it."""
-        if record.msg:
-            msg = _hex_escape.sub(
-                '', _ansi_escape.sub('', record.msg.strip(' \t\n\x0b\x0c'))
-            )
-            if msg[:1] == '\r':
-                file_descriptor = getattr(self.stream, 'fileno', None)
-                if file_descriptor:
-                    file_descriptor = file_descriptor()
-                    if file_descriptor in (1, 2):  # stdout or stderr
-                        self.stream.write(
-                            '\r' + (
-                                ' ' * (
-                                    _shutil.get_terminal_size(file_descriptor).columns -
-                                    1
-                                )
-                            ) + '\r'
-                        )
-                        index = record.msg.rfind('\r')
-                        find = _re.compile(r'(\x1b\[(?:\d+(?:;(?:\d+))*)m)')
-                        record.msg = _gc(*find.split(record.msg[:index])
-                                         ) + record.msg[index + 1:]
+        prefix = self._cr_prefix(record)
+        if prefix:
+            self.stream.write(prefix)
 
     def check_nl(self, record) -> None:
         """Check if the record contains a newline and handle it."""
-        while record.msg and record.msg[0] == '\n':
-            file_descriptor = getattr(self.stream, 'fileno', None)
-            if file_descriptor:
-                file_descriptor = file_descriptor()
-                if file_descriptor in (1, 2):  # stdout or stderr
-                    self.stream.write('\n')
-                    record.msg = record.msg[1:]
+        prefix = self._nl_prefix(record)
+        if prefix:
+            self.stream.write(prefix)
+
+    def _render(self, record) -> str:
+        """Handle the carriage returns and new lines of the record and format it.
+
+        :return: Everything that must be written to the stream for the record.
+        """
+        prefix = ''
+        if self.HandleCR:
+            prefix = self._cr_prefix(record)
+        if self.HandleNL:
+            prefix += self._nl_prefix(record)
+        return prefix + self.format(record) + self.terminator
+
+    def _write_text(self, text: str) -> None:
+        """Write the rendered text of one or more records and flush the stream."""
+        self.stream.write(text)
+        self.flush()
+
+    def _deliver(
+        self,
+        text: str,
+        level: int  # pylint: disable=unused-argument
+    ) -> None:
+        """Pass the rendered text of one or more records on to the stream.
+
+        :param text: The rendered text.
+        :param level: The highest level of the records.
+        """
+        self._write_text(text)
 
     def emit(self, record) -> None:
         if self.HandleCR:
@@ -93,42 +177,280 @@ class StreamHandler(_StreamHandler):
             self.check_nl(record)
         super().emit(record)
 
+    def handle_batch(self, records) -> None:
+        """Handle several records with one acquisition of the lock and one write.
+
+        :param records: The records to handle.
+        """
+        records = [record for record in records if self.filter(record)]
+        if not records:
+            return
+        self.acquire()
+        try:
+            chunks = []
+            for record in records:
+                try:
+                    chunks.append(self._render(record))
+                except Exception:  # pylint: disable=broad-except
+                    self.handleError(record)
+            if chunks:
+                try:
+                    self._deliver(
+                        ''.join(chunks), max(record.levelno for record in records)
+                    )
+                except Exception:  # pylint: disable=broad-except
+                    self.handleError(records[-1])
+        finally:
+            self.release()
+
     def clear_line(self, length: _Optional[int] = None) -> None:
         """Clear the current line.
 
         :param length: The length of the line to clear.
         :return:
         """
-        file_descriptor = getattr(self.stream, 'fileno', None)
-        if file_descriptor:
-            file_descriptor = file_descriptor()
-            if file_descriptor in (1, 2):
-                if length is None:
-                    length = _shutil.get_terminal_size(file_descriptor).columns
-                self.stream.write('\r' + (' ' * (length - 1)) + '\r')
+        file_descriptor = self._get_console_fd()
+        if file_descriptor is not None:
+            if length is None:
+                length = _get_terminal_size(file_descriptor).columns
+            self.stream.write('\r' + (' ' * (length - 1)) + '\r')
 
 
 # A stream handler that supports colorizing.
 class ColorizingStreamHandler(StreamHandler):
-    """A stream handler that supports colorizing even in Windows."""
+    """A stream handler that supports colorizing even in Windows.
+
+    With `colorize=None` the colors are only written to streams that show them (see
+    `log21.colors.supports_color`); for the rest, a ColorizingFormatter is replaced by
+    its plain formatter, so no time is spent on colors.
+
+    In the buffered mode (`buffer_size` > 0) the rendered records are gathered in
+    memory and written at once when `buffer_size` characters have been gathered,
+    `flush_interval` milliseconds after the first of them, when a record of
+    `flush_level` or higher comes, or when the handler is flushed (e.g. at exit).
+
+    >>> import log21
+    >>>
+    >>> logger = log21.Logger('Collector')
+    >>> logger.addHandler(log21.ColorizingStreamHandler(
+    ...     buffer_size=64 * 1024, flush_interval=200))
+
+    With `raw=True` the records are encoded and written straight to the file descriptor
+    of the stream with `os.write`. Streams without a file descriptor, and Windows
+    consoles, keep using the text layer.
+
+    With `non_blocking=True` a reader that doesn't keep up, like a stuck pipe, can't
+    stall the logging thread: the terminal or the pipe of the stream is opened once
+    more in non-blocking mode, what the reader doesn't take right away waits in a spill
+    buffer of `spill_size` bytes, and when the spill buffer is full `overflow_policy`
+    decides whether to wait for the reader for up to `overflow_timeout` seconds, to
+    drop the records or to write them to `divert_file`. `stats()` tells how many bytes
+    have been delayed, dropped and diverted. Terminals can be opened again on every
+    Unix, but pipes only on Linux (through `/proc/self/fd`); elsewhere, and on Windows,
+    they are written in blocking mode and a RuntimeWarning says so.
+
+    >>> logger.addHandler(log21.ColorizingStreamHandler(
+    ...     non_blocking=True, overflow_policy='divert', divert_file='overflow.log'))
+    """
+
+    def __init__(
+        self,
+        *args,
+        colorize: _Optional[bool] = None,
+        buffer_size: int = 0,
+        flush_interval: _Optional[float] = None,
+        flush_level: int = ERROR,
+        raw: bool = False,
+        non_blocking: bool = False,
+        spill_size: int = 1024 * 1024,
+        overflow_policy: str = 'wait',
+        overflow_timeout: float = 1.0,
+        divert_file: _Optional[str] = None,
+        **kwargs
+    ) -> None:
+        """Initialize the handler.
+
+        :param args: The arguments of StreamHandler.
+        :param colorize: Whether to write colors. None means to write them only if the
+            stream supports them.
+        :param buffer_size: The number of characters to gather before writing them.
+            0 disables the buffered mode.
+        :param flush_interval: The maximum number of milliseconds a record may wait in
+            the buffer. None means no limit.
+        :param flush_level: The lowest level of the records that are written at once
+            along with everything that is in the buffer.
+        :param raw: Whether to write to the file descriptor of the stream directly.
+        :param non_blocking: Whether to write to the stream without waiting for a slow
+            reader. It implies `raw`.
+        :param spill_size: The maximum number of bytes to hold while the reader is
+            slow, in the non-blocking mode.
+        :param overflow_policy: What to do when the spill buffer is full: 'wait',
+            'drop' or 'divert'.
+        :param overflow_timeout: The maximum number of seconds to wait for the reader
+            with the 'wait' policy.
+        :param divert_file: The path of the file that the records go to with the
+            'divert' policy.
+        :param kwargs: The keyword arguments of StreamHandler.
+        """
+        if overflow_policy not in ('wait', 'drop', 'divert'):
+            raise ValueError(
+                "`overflow_policy` must be one of: 'wait', 'drop', 'divert'"
+            )
+        if overflow_policy == 'divert' and divert_file is None:
+            raise ValueError("`divert_file` is required for the 'divert' policy")
+        self.raw = raw
+        self.non_blocking = non_blocking
+        self.spill_size = spill_size
+        self.overflow_policy = overflow_policy
+        self.overflow_timeout = overflow_timeout
+        self.divert_file = divert_file
+        self._raw_stream = None
+        self._raw_writer: _Optional[_RawWriter] = None
+        # The statistics of the writer that `close` released
+        self._closed_stats: _Dict[str, int] = {}
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self.colorize = colorize
+        self._colors_stream = None
+        self._colors = True
+        self._buffer: _List[str] = []
+        self._buffered = 0
+        self._flusher: _Optional[_PeriodicFlusher] = None
+        super().__init__(*args, **kwargs)
+
+    def use_colors(self) -> bool:
+        """Check if the colors should be written to the stream."""
+        if self.colorize is not None:
+            return self.colorize
+        stream = self.stream
+        if stream is not self._colors_stream:
+            self._colors = _supports_color(stream)
+            self._colors_stream = stream
+        return self._colors
+
+    def format(self, record) -> str:
+        """Format the record, without colors if the stream doesn't show them."""
+        formatter = self.formatter
+        if isinstance(formatter, _ColorizingFormatter) and not self.use_colors():
+            if type(formatter).format is _ColorizingFormatter.format:
+                # Rendered by the methods of the formatter, without the colors
+                return formatter.format_pair(record, colored=False)[1]
+            return _strip_escapes(super().format(record))
+        return super().format(record)
 
     def emit(self, record) -> None:
         try:
-            if self.HandleCR:
-                self.check_cr(record)
-            if self.HandleNL:
-                self.check_nl(record)
-            msg = self.format(record)
-            if IS_WINDOWS:
-                self.convert_and_write(msg)
-                self.convert_and_write(self.terminator)
-            else:
-                self.write(msg)
-                self.write(self.terminator)
-            self.flush()
+            self._deliver(self._render(record), record.levelno)
         except Exception:  # pylint: disable=broad-except
             self.handleError(record)
 
+    def _deliver(self, text: str, level: int) -> None:
+        if self.buffer_size <= 0:
+            self._write_text(text)
+            return
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_size or level >= self.flush_level:
+            self._flush_buffer()
+        elif self.flush_interval is not None:
+            if self._flusher is None:
+                self._flusher = _PeriodicFlusher(
+                    self.flush, self.flush_interval / 1000
+                )
+            self._flusher.schedule()
+
+    def _flush_buffer(self) -> None:
+        """Write the buffered text; the lock of the handler must be held."""
+        if self._buffer:
+            texts, self._buffer = self._buffer, []
+            self._buffered = 0
+            writer = self._get_raw_writer()
+            if writer is not None:
+                writer.write_many(texts)
+            else:
+                self._write_text(''.join(texts))
+
+    def flush(self) -> None:
+        """Write the buffered records and flush the stream."""
+        self.acquire()
+        try:
+            if self._buffer:
+                # Writing the buffer flushes the stream as well
+                self._flush_buffer()
+            else:
+                super().flush()
+            if self._raw_writer is not None:
+                self._raw_writer.flush()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        """Write the buffered records and close the handler."""
+        if self._flusher is not None:
+            self._flusher.stop()
+        self.flush()
+        self.acquire()
+        try:
+            writer = self._raw_writer
+            if writer is not None:
+                # The file descriptor may be reused after the stream is closed, so
+                # the writer isn't; a later record checks the stream again
+                writer.close()
+                stats = getattr(writer, 'stats', None)
+                self._closed_stats = stats() if stats is not None else {}
+                self._raw_writer = None
+                self._raw_stream = None
+        finally:
+            self.release()
+        super().close()
+
+    def stats(self) -> _Dict[str, int]:
+        """Return the statistics of the non-blocking mode.
+
+        :return: A dictionary with the number of the bytes that have been written,
+            delayed, dropped and diverted, and the number of the bytes that are waiting
+            for the reader. It is empty if the handler hasn't written in the
+            non-blocking mode.
+        """
+        if self._raw_writer is None:
+            return dict(self._closed_stats)
+        stats = getattr(self._raw_writer, 'stats', None)
+        return stats() if stats is not None else {}
+
+    def _get_raw_writer(self) -> _Optional[_RawWriter]:
+        """Return the RawWriter of the stream in the raw mode, or None."""
+        if not (self.raw or self.non_blocking):
+            return None
+        stream = self.stream
+        if stream is not self._raw_stream:
+            if self._raw_writer is not None:
+                self._raw_writer.close()
+            if self.non_blocking:
+                self._raw_writer = _open_non_blocking_writer(
+                    stream,
+                    spill_size=self.spill_size,
+                    policy=self.overflow_policy,
+                    timeout=self.overflow_timeout,
+                    divert_file=self.divert_file
+                )
+            else:
+                self._raw_writer = _open_raw_writer(stream)
+            self._raw_stream = stream
+        return self._raw_writer
+
+    def _write_text(self, text: str) -> None:
+        writer = self._get_raw_writer()
+        if writer is not None:
+            # There is nothing to flush
+            writer.write(text)
+            return
+        if IS_WINDOWS:
+            self.convert_and_write(text)
+        else:
+            self.stream.write(text)
+        self.flush()
+
     # Writes colorized text to the Windows console.
     def convert_and_write(self, message) -> None:
         """Convert the message to a Windows console colorized message and write it to
@@ -172,13 +494,10 @@ class ColorizingStreamHandler(StreamHandler):
 
         parts = _ansi_escape.split(message)
         win_handle = None
-        file_descriptor = getattr(self.stream, 'fileno', None)
-
-        if file_descriptor:
-            file_descriptor = file_descriptor()
+        file_descriptor = self._get_console_fd()
 
-            if file_descriptor in (1, 2):  # stdout or stderr
-                win_handle = ctypes.windll.kernel32.GetStdHandle(-10 - file_descriptor)
+        if file_descriptor is not None:  # stdout or stderr
+            win_handle = ctypes.windll.kernel32.GetStdHandle(-10 - file_descriptor)
 
         while parts:
             text = parts.pop(0)
@@ -206,3 +525,131 @@ class ColorizingStreamHandler(StreamHandler):
         """Write the message to the stream."""
         self.stream.write(message)
         self.flush()
+
+
+class AsyncColorizingStreamHandler(ColorizingStreamHandler):
+    """A ColorizingStreamHandler that doesn't block the event loop when it is used by
+    the coroutine methods of Logger (e.g. `await logger.ainfo(...)`).
+
+    Terminals and pipes are written to through a transport of the running event loop;
+    other streams, and every stream on Windows, are written to by a dedicated thread.
+    The synchronous methods work just like they do in ColorizingStreamHandler.
+
+    >>> import asyncio
+    >>> import log21
+    >>>
+    >>> logger = log21.Logger('Service', log21.INFO)
+    >>> logger.addHandler(log21.AsyncColorizingStreamHandler(
+    ...     formatter=log21.ColorizingFormatter('[%(levelname)s] %(message)s')))
+    >>>
+    >>> asyncio.run(logger.ainfo('The loop goes on!'))
+    [INFO] The loop goes on!
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._writer: _Optional[_asyncio.StreamWriter] = None
+        self._writer_loop: _Optional[_asyncio.AbstractEventLoop] = None
+        self._writer_task: _Optional[_asyncio.Task] = None
+        self._executor: _Optional[_ThreadPoolExecutor] = None
+
+    def _open_pipe(self):  # noqa: ANN202
+        """Open the terminal or the pipe of the stream once more.
+
+        The event loop makes the file it writes to non-blocking, which must not affect
+        the stream that the rest of the program writes to, so a new open file is used.
+
+        :return: The opened file or None if the stream can't be opened again.
+        """
+        file_descriptor = _reopen(self.stream)
+        if file_descriptor is None:
+            return None
+        return open(file_descriptor, 'wb', buffering=0)  # noqa: SIM115
+
+    async def _connect(
+        self, loop: _asyncio.AbstractEventLoop
+    ) -> _Optional[_asyncio.StreamWriter]:
+        """Connect the stream to a transport of the loop if it is possible."""
+        pipe = self._open_pipe()
+        if pipe is None:
+            return None
+        # Whatever is buffered in the stream must be written before the transport's
+        # output
+        self.flush()
+        try:
+            transport, protocol = await loop.connect_write_pipe(
+                lambda: _asyncio.streams.FlowControlMixin(loop), pipe
+            )
+        except (OSError, ValueError, NotImplementedError):
+            pipe.close()
+            return None
+        return _asyncio.StreamWriter(transport, protocol, None, loop)
+
+    async def _get_writer(self) -> _Optional[_asyncio.StreamWriter]:
+        """Return the writer of the running loop, or None if there can't be one."""
+        loop = _asyncio.get_running_loop()
+        if self._writer_loop is not loop:
+            self._close_writer()
+            self._writer_loop = loop
+            self._writer_task = loop.create_task(self._connect(loop))
+        self._writer = await self._writer_task
+        return self._writer
+
+    def _close_writer(self) -> None:
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except RuntimeError:
+                # The loop of the writer is already closed
+                pass
+        self._writer = self._writer_loop = self._writer_task = None
+
+    def _emit_locked(self, record) -> None:
+        self.acquire()
+        try:
+            self.emit(record)
+        finally:
+            self.release()
+
+    async def ahandle(self, record) -> bool:
+        """Handle the record without blocking the event loop.
+
+        :param record: The record to handle.
+        :return: Whether the record passed the filters.
+        """
+        if not self.filter(record):
+            return False
+        writer = await self._get_writer()
+        if writer is None:
+            if self._executor is None:
+                self._executor = _ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix='log21-stream'
+                )
+            await _asyncio.get_running_loop().run_in_executor(
+                self._executor, self._emit_locked, record
+            )
+            return True
+        try:
+            self.acquire()
+            try:
+                text = self._render(record)
+            finally:
+                self.release()
+            writer.write(
+                text.encode(
+                    getattr(self.stream, 'encoding', None) or 'utf-8',
+                    getattr(self.stream, 'errors', None) or 'strict'
+                )
+            )
+            await writer.drain()
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+        return True
+
+    def close(self) -> None:
+        """Close the transport and the thread of the handler."""
+        self._close_writer()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        super().close()
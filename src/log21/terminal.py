@@ -0,0 +1,134 @@
+# log21.terminal.py
+# CodeWriter21
+
+# yapf: disable
+
+import os as _os
+import sys as _sys
+import time as _time
+import signal as _signal
+import threading as _threading
+from typing import Dict as _Dict, Tuple as _Tuple, Optional as _Optional
+
+# yapf: enable
+
+__all__ = ['get_terminal_size', 'invalidate_terminal_size', 'watch_resize']
+
+# How long a size is trusted when SIGWINCH isn't watched to tell about resizes
+CACHE_TTL = 1.0
+
+# The sizes that have been looked up, by file descriptor and fallback size, with the
+# time of the lookup
+_sizes: _Dict[tuple, _Tuple[_os.terminal_size, float]] = {}
+
+
+def invalidate_terminal_size() -> None:
+    """Forget the cached terminal sizes, so they are looked up on their next use."""
+    _sizes.clear()
+
+
+class _ResizeWatcher:
+    """The SIGWINCH handler that forgets the cached sizes and calls the handler that
+    it replaced."""
+
+    def __init__(self) -> None:
+        self.previous = None
+        self.installed = False
+        self._lock = _threading.Lock()
+
+    def __call__(self, signum, frame) -> None:  # noqa: ANN001
+        invalidate_terminal_size()
+        if callable(self.previous):
+            self.previous(signum, frame)
+
+    def install(self) -> bool:
+        """Set the handler, keeping the handler that was there before.
+
+        :return: Whether SIGWINCH is watched.
+        """
+        if not hasattr(_signal, 'SIGWINCH'):
+            return False
+        with self._lock:
+            if not self.is_listening():
+                try:
+                    previous = _signal.getsignal(_signal.SIGWINCH)
+                    _signal.signal(_signal.SIGWINCH, self)
+                except (ValueError, OSError):
+                    # Not the main thread
+                    return False
+                self.previous = previous
+                self.installed = True
+        return True
+
+    def is_listening(self) -> bool:
+        """Check if SIGWINCH still reaches the handler."""
+        return self.installed and _signal.getsignal(_signal.SIGWINCH) is self
+
+
+_watcher = _ResizeWatcher()
+
+
+def watch_resize() -> bool:
+    """Forget the cached terminal sizes as soon as the terminal is resized, instead of
+    trusting them for `CACHE_TTL` seconds.
+
+    It sets a SIGWINCH handler that calls the handler that was there before, so it is
+    left to the application to call it, from the main thread. Systems without SIGWINCH
+    (e.g. Windows) keep the expiring sizes.
+
+    :return: Whether SIGWINCH is watched.
+    """
+    return _watcher.install()
+
+
+def _lookup(file_descriptor: _Optional[int],
+            fallback: _Tuple[int, int]) -> _os.terminal_size:
+    """Look the size up the way `shutil.get_terminal_size` does, for any file
+    descriptor."""
+    try:
+        columns = int(_os.environ['COLUMNS'])
+    except (KeyError, ValueError):
+        columns = 0
+    try:
+        lines = int(_os.environ['LINES'])
+    except (KeyError, ValueError):
+        lines = 0
+    if columns <= 0 or lines <= 0:
+        try:
+            size = _os.get_terminal_size(
+                _sys.__stdout__.fileno()
+                if file_descriptor is None else file_descriptor
+            )
+        except (AttributeError, ValueError, OSError):
+            size = _os.terminal_size(fallback)
+        if columns <= 0:
+            columns = size.columns or fallback[0]
+        if lines <= 0:
+            lines = size.lines or fallback[1]
+    return _os.terminal_size((columns, lines))
+
+
+def get_terminal_size(
+    file_descriptor: _Optional[int] = None,
+    fallback: _Tuple[int, int] = (80, 24)
+) -> _os.terminal_size:
+    """Return the size of the terminal, looking it up again after `CACHE_TTL` seconds
+    or, with `watch_resize`, after the terminal has been resized.
+
+    Like `shutil.get_terminal_size`, the COLUMNS and LINES environment variables take
+    precedence over the size of the terminal.
+
+    :param file_descriptor: The file descriptor of the terminal. None means the
+        original standard output.
+    :param fallback: The size to use when the size of the terminal is unknown.
+    :return: The size of the terminal.
+    """
+    key = (file_descriptor, fallback)
+    cached = _sizes.get(key)
+    if cached is not None and (
+        _watcher.is_listening() or _time.monotonic() - cached[1] < CACHE_TTL
+    ):
+        return cached[0]
+    size = _lookup(file_descriptor, fallback)
+    _sizes[key] = (size, _time.monotonic())
+    return size
@@ -0,0 +1,69 @@
+import enum
+import decimal
+import logging
+
+import log21
+from log21.decode import decode
+from log21._binary_format import (RenderedInt, RenderedFloat, RenderedObject,
+                                  read_records)
+
+
+class _Recorder(logging.Handler):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+class _Color(enum.IntEnum):
+    RED = 1
+
+
+class _Point:
+
+    def __str__(self) -> str:
+        return '(1, 2)'
+
+    def __repr__(self) -> str:
+        return 'Point(1, 2)'
+
+
+def test_records_round_trip(tmp_path) -> None:
+    path = tmp_path / 'app.log21'
+    handler = log21.BinaryFileHandler(path, mode='w')
+    recorder = _Recorder()
+    logger = log21.Logger('test_records_round_trip', log21.DEBUG)
+    logger.addHandler(handler)
+    logger.addHandler(recorder)
+
+    logger.info('int %d float %.3f text %s', args=(7, 2.5, 'value'))
+    logger.info('joined', 1, 2.5, True, None, b'bytes', _Point())
+    logger.info('a %s', 'b', args=(1, ))
+    logger.warning('%(key)s=%(value)x', args=({'key': 'k', 'value': 255}, ))
+    logger.error(
+        'enum %d %r decimal %.2f %s object %s %r',
+        args=(
+            _Color.RED, _Color.RED, decimal.Decimal('1.235'), decimal.Decimal('1.5'),
+            _Point(), _Point()
+        )
+    )
+    logger.debug('big %d small %s', args=(2**80, -1e-300))
+    handler.close()
+
+    formatter = logging.Formatter('%(levelname)s %(name)s:%(lineno)d %(message)s')
+    with open(path, 'rb') as file:
+        texts = list(decode(file, formatter))
+    assert texts == [formatter.format(record) for record in recorder.records]
+
+    with open(path, 'rb') as file:
+        records = list(read_records(file))
+    assert records[2]['args'] == (1, )
+    assert [type(value) for value in records[4]['args']] == [
+        RenderedInt, RenderedInt, RenderedFloat, RenderedFloat, RenderedObject,
+        RenderedObject
+    ]
+    assert records[5]['args'] == (2**80, -1e-300)
+    assert [type(value) for value in records[5]['args']] == [int, float]
@@ -0,0 +1,176 @@
+import bz2
+import gzip
+import lzma
+import time
+import logging
+import threading
+
+import pytest
+
+import log21
+
+
+def _make_logger(name: str, handler) -> log21.Logger:
+    logger = log21.Logger(name, log21.DEBUG)
+    logger.addHandler(handler)
+    return logger
+
+
+def test_group_commit_writes_every_record(tmp_path) -> None:
+    path = tmp_path / 'group.log'
+    handler = log21.GroupCommitFileHandler(
+        path, durability='fsync-interval', fsync_interval=10
+    )
+    logger = _make_logger('test_group_commit_writes_every_record', handler)
+    threads_before = threading.active_count()
+
+    def log(number: int) -> None:
+        for i in range(200):
+            logger.info('thread %d record %d', args=(number, i))
+
+    threads = [threading.Thread(target=log, args=(number, )) for number in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # At most the thread that syncs the file is left
+    assert threading.active_count() <= threads_before + 1
+    handler.close()
+    assert threading.active_count() == threads_before
+
+    lines = path.read_text().splitlines()
+    assert sorted(lines) == sorted(
+        f'thread {number} record {i}' for number in range(8) for i in range(200)
+    )
+    stats = handler.stats()
+    assert stats['records'] == 1600
+    assert stats['batches'] <= 1600
+    assert stats['fsyncs'] >= 1
+
+
+def test_compressed_streams_read_back(tmp_path) -> None:
+    for compression, module in (('gzip', gzip), ('bz2', bz2), ('lzma', lzma)):
+        path = tmp_path / f'compressed.log.{compression}'
+        handler = log21.CompressedFileHandler(
+            path, compression=compression, sync_interval=10
+        )
+        logger = _make_logger(f'test_compressed_{compression}', handler)
+        expected = []
+        for stream in range(3):
+            for i in range(50):
+                logger.info('stream %d record %d', args=(stream, i))
+                expected.append(f'stream {stream} record {i}')
+            # Each interval finishes a compressed stream
+            deadline = time.monotonic() + 5
+            while handler._unsynced:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            # The stream is written under the lock of the handler
+            handler.acquire()
+            handler.release()
+            with module.open(path, 'rt') as file:
+                assert file.read().splitlines() == expected
+        logger.info('last')
+        handler.close()
+        with module.open(path, 'rt') as file:
+            assert file.read().splitlines() == expected + ['last']
+
+
+def test_rotation_keeps_backup_count_files(tmp_path) -> None:
+    path = tmp_path / 'rotating.log'
+    handler = log21.RotatingFileHandler(path, max_bytes=100, backup_count=2)
+    logger = _make_logger('test_rotation_keeps_backup_count_files', handler)
+    # 10 bytes per record, 10 records per file
+    for i in range(45):
+        logger.info('record %02d', args=(i, ))
+    handler.close()
+
+    assert sorted(file.name for file in tmp_path.iterdir()) == [
+        'rotating.log', 'rotating.log.1', 'rotating.log.2'
+    ]
+    assert path.read_text().splitlines() == [f'record {i}' for i in range(40, 45)]
+    for number, first in ((1, 30), (2, 20)):
+        assert (tmp_path / f'rotating.log.{number}').read_text().splitlines() == [
+            f'record {i}' for i in range(first, first + 10)
+        ]
+
+
+def test_backup_count_requires_max_size(tmp_path) -> None:
+    with pytest.raises(ValueError, match='max_size'):
+        log21.get_logger(
+            'test_backup_count_requires_max_size',
+            file=tmp_path / 'app.log',
+            backup_count=3,
+            override=True
+        )
+    with pytest.raises(ValueError, match='file'):
+        log21.get_logger(
+            'test_backup_count_requires_max_size', max_size='1MiB', override=True
+        )
+
+
+def _record(name: str, message: str, created: float) -> logging.LogRecord:
+    return logging.makeLogRecord({
+        'name': name,
+        'msg': message,
+        'levelno': log21.INFO,
+        'levelname': 'INFO',
+        'created': created
+    })
+
+
+def test_timed_rollover_keeps_backup_count_files(tmp_path) -> None:
+    path = tmp_path / 'timed.log'
+    handler = log21.TimedRotatingFileHandler(
+        path, when=lambda current_time: (current_time // 10 + 1) * 10, backup_count=2
+    )
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    start = handler.rollover_at
+    # Four files: the current one and the ones that start at `start + 10 * n`
+    for offset in (-1, 0.5, 5, 10.5, 20.5, 25):
+        handler.handle(_record('timed', f'at {offset}\n', start + offset))
+    handler.close()
+
+    closed = sorted(file.name for file in tmp_path.iterdir() if file != path)
+    assert len(closed) == 2
+    assert [(tmp_path / name).read_text() for name in closed] == [
+        'at 0.5\nat 5\n', 'at 10.5\n'
+    ]
+    assert path.read_text() == 'at 20.5\nat 25\n'
+    assert handler.rollover_at == start + 30
+
+
+def test_failed_rollover_is_not_tried_for_every_record(tmp_path, monkeypatch) -> None:
+    replaced = []
+
+    def replace(source, destination) -> None:
+        replaced.append(source)
+        raise PermissionError('the file is in use')
+
+    monkeypatch.setattr(logging, 'raiseExceptions', False)
+    rotating = log21.RotatingFileHandler(
+        tmp_path / 'rotating.log', max_bytes=100, backup_count=1
+    )
+    timed = log21.TimedRotatingFileHandler(
+        tmp_path / 'timed.log', when=lambda current_time: current_time + 10
+    )
+    start = timed.rollover_at
+    with monkeypatch.context() as patch:
+        patch.setattr('os.replace', replace)
+        for i in range(30):
+            rotating.handle(_record('rotating', f'record {i:02d}\n', start))
+        assert len(replaced) == 2
+        replaced.clear()
+        for i in range(5):
+            timed.handle(_record('timed', f'record {i}\n', start + i))
+        assert len(replaced) == 1
+        assert timed.rollover_at == start + 10
+    rotating.close()
+    timed.close()
+
+    assert (tmp_path / 'rotating.log').read_text().splitlines() == [
+        f'record {i:02d}' for i in range(30)
+    ]
+    assert (tmp_path / 'timed.log').read_text().splitlines() == [
+        f'record {i}' for i in range(5)
+    ]
@@ -0,0 +1,32 @@
+import pickle
+import logging
+
+import log21
+
+
+def _make_record(msg: str = 'value %d', args: tuple = (1, )) -> logging.LogRecord:
+    return logging.LogRecord('test', log21.INFO, __file__, 1, msg, args, None)
+
+
+def test_rendered_values_stay_out_of_the_record() -> None:
+    record = _make_record()
+    formatter = log21.ColorizingFormatter('[%(asctime)s] %(message)s')
+    plain = formatter.linked_plain_formatter()
+    before = dict(record.__dict__)
+
+    formatter.format(record)
+    plain.format(record)
+
+    assert set(record.__dict__) - set(before) <= {'message', 'asctime'}
+    assert pickle.loads(pickle.dumps(record)).getMessage() == 'value 1'
+
+
+def test_linked_formatters_render_the_same_text() -> None:
+    record = _make_record()
+    formatter = log21.ColorizingFormatter('%(levelname)s %(message)s')
+    plain = formatter.linked_plain_formatter()
+
+    colored = formatter.format(record)
+
+    assert plain.format(record) == 'INFO value 1'
+    assert log21.DecolorizingFormatter.decolorize(colored) == 'INFO value 1'
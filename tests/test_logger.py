@@ -0,0 +1,93 @@
+import sys
+import asyncio
+import logging
+
+import log21
+
+
+class _Recorder(logging.Handler):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def _make_logger(name: str) -> tuple:
+    logger = log21.Logger(name, log21.DEBUG)
+    recorder = _Recorder()
+    logger.addHandler(recorder)
+    return logger, recorder
+
+
+def _assert_caller(records: list, function, line: int) -> None:
+    assert records
+    for record in records:
+        assert record.funcName == function.__name__
+        assert record.pathname == function.__code__.co_filename
+        assert record.lineno == line
+
+
+def test_caller_of_single_messages() -> None:
+    logger, recorder = _make_logger('test_caller_of_single_messages')
+    line = sys._getframe().f_lineno + 1
+    logger.info('value %d', args=(1, ))
+    _assert_caller(recorder.records, test_caller_of_single_messages, line)
+
+
+def test_caller_of_many_messages() -> None:
+    logger, recorder = _make_logger('test_caller_of_many_messages')
+    line = sys._getframe().f_lineno + 1
+    logger.info_many(['first', 'second'])
+    _assert_caller(recorder.records, test_caller_of_many_messages, line)
+
+    recorder.records.clear()
+    line = sys._getframe().f_lineno + 1
+    logger.log_many(log21.WARNING, ['first', 'second'])
+    _assert_caller(recorder.records, test_caller_of_many_messages, line)
+
+
+def test_caller_of_coroutines() -> None:
+    logger, recorder = _make_logger('test_caller_of_coroutines')
+    lines = []
+
+    async def log() -> None:
+        lines.append(sys._getframe().f_lineno + 1)
+        await logger.ainfo('value %d', args=(1, ))
+        lines.append(sys._getframe().f_lineno + 1)
+        await logger.alog(log21.ERROR, 'value', 2)
+
+    asyncio.run(log())
+    assert [record.lineno for record in recorder.records] == lines
+    for record in recorder.records:
+        assert record.funcName == 'log'
+        assert record.pathname == __file__
+
+
+def test_stacklevel_counts_the_callers_frames() -> None:
+    logger, recorder = _make_logger('test_stacklevel_counts_the_callers_frames')
+
+    def helper() -> None:
+        logger.info('from the helper', stacklevel=2)
+
+    line = sys._getframe().f_lineno + 1
+    helper()
+    _assert_caller(
+        recorder.records, test_stacklevel_counts_the_callers_frames, line
+    )
+
+
+def test_add_level_keeps_the_type_of_the_logger() -> None:
+    logger, recorder = _make_logger('test_add_level_keeps_the_type_of_the_logger')
+    other = log21.Logger('test_add_level_other', log21.DEBUG)
+    logger.add_levels({25: 'notice', 35: 'alert'})
+
+    assert type(logger) is log21.Logger
+    assert not hasattr(other, 'notice')
+    logger.notice('value %d', args=(1, ))
+    logger.alert('value', 2)
+    assert [(record.levelno, record.getMessage()) for record in recorder.records] == [
+        (25, 'value 1\n'), (35, 'value 2\n')
+    ]
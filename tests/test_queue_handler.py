@@ -0,0 +1,68 @@
+import time
+import logging
+import threading
+
+import log21
+from log21.queue_handler import OverloadQueue
+
+
+def _make_record(level: int = log21.INFO) -> logging.LogRecord:
+    return logging.LogRecord('test', level, __file__, 1, 'message', (), None)
+
+
+class _SlowHandler(logging.Handler):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        time.sleep(0.0002)
+        self.records.append(record)
+
+
+def test_stats_add_up() -> None:
+    handler = _SlowHandler()
+    queue = OverloadQueue(maxsize=20, sample_rates={}, summary_interval=3600)
+    queue_handler = log21.make_async(handler, queue=queue)
+    levels = (log21.DEBUG, log21.INFO, log21.WARNING)
+    for i in range(2000):
+        queue_handler.handle(_make_record(levels[i % 3]))
+    queue_handler.close()
+
+    stats = queue_handler.stats()
+    assert stats['dropped'] > 0
+    assert stats['enqueued'] == stats['processed'] + stats['depth'] + stats['evicted']
+    assert stats['dropped'] == stats['rejected'] + stats['evicted']
+    assert sum(stats['dropped_by_level'].values()) == stats['dropped']
+    summaries = [record for record in handler.records if record.name == 'log21.queue']
+    assert len(handler.records) - len(summaries) == stats['processed']
+
+
+def test_blocking_put_does_not_hold_the_other_threads() -> None:
+    queue = OverloadQueue(maxsize=1, policy='block', block_timeout=1)
+    queue_handler = log21.QueueHandler(queue)
+    queue_handler.handle(_make_record())
+    blocked = threading.Thread(target=queue_handler.handle, args=(_make_record(), ))
+    blocked.start()
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    queue_handler.handle(_make_record(log21.ERROR))
+    elapsed = time.monotonic() - start
+    blocked.join()
+
+    assert elapsed < 0.5
+    assert queue_handler.stats()['rejected'] == 1
+
+
+def test_priority_lane_can_be_bounded() -> None:
+    queue = OverloadQueue(maxsize=10, priority_maxsize=3)
+    queue_handler = log21.QueueHandler(queue)
+    for _ in range(10):
+        queue_handler.handle(_make_record(log21.ERROR))
+
+    stats = queue_handler.stats()
+    assert stats['depth'] == 3
+    assert stats['enqueued'] == 3
+    assert stats['rejected'] == 7
@@ -0,0 +1,116 @@
+import io
+import time
+import threading
+
+import log21
+from log21.stream_handler import ColorizingStreamHandler
+
+
+def test_buffer_is_flushed_from_one_thread() -> None:
+    stream = io.StringIO()
+    handler = ColorizingStreamHandler(
+        stream=stream, colorize=False, buffer_size=1 << 20, flush_interval=20
+    )
+    logger = log21.Logger('test_buffer_is_flushed_from_one_thread', log21.DEBUG)
+    logger.addHandler(handler)
+    threads = threading.active_count()
+
+    for round_ in range(3):
+        for i in range(10):
+            logger.info('value %d', args=(i, ))
+        deadline = time.monotonic() + 5
+        while len(stream.getvalue().splitlines()) < 10 * (round_ + 1):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert threading.active_count() == threads + 1
+
+    handler.close()
+    assert threading.active_count() == threads
+
+
+def test_records_after_close_do_not_reach_a_reused_descriptor(tmp_path) -> None:
+    import os
+
+    stream = open(tmp_path / 'first.log', 'w')  # noqa: SIM115
+    handler = ColorizingStreamHandler(stream=stream, colorize=False, raw=True)
+    errors = []
+    handler.handleError = errors.append
+    logger = log21.Logger('test_records_after_close', log21.DEBUG)
+    logger.addHandler(handler)
+
+    logger.info('before')
+    handler.close()
+    file_descriptor = stream.fileno()
+    stream.close()
+    # Another file takes the file descriptor of the closed stream
+    other = os.open(tmp_path / 'second.log', os.O_WRONLY | os.O_CREAT)
+    if other != file_descriptor:
+        os.dup2(other, file_descriptor)
+        os.close(other)
+    try:
+        logger.info('after')
+    finally:
+        os.close(file_descriptor)
+    assert (tmp_path / 'first.log').read_text() == 'before\n'
+    assert (tmp_path / 'second.log').read_text() == ''
+    assert len(errors) == 1
+
+
+def test_stats_are_kept_after_close() -> None:
+    import os
+
+    read_end, write_end = os.pipe()
+    stream = os.fdopen(write_end, 'w')
+    handler = ColorizingStreamHandler(
+        stream=stream, colorize=False, non_blocking=True
+    )
+    logger = log21.Logger('test_stats_are_kept_after_close', log21.DEBUG)
+    logger.addHandler(handler)
+    logger.info('value')
+    handler.close()
+    try:
+        assert os.read(read_end, 100) == b'value\n'
+        assert handler.stats()['bytes_written'] == 6
+    finally:
+        stream.close()
+        os.close(read_end)
+
+
+def test_plain_text_keeps_the_overrides_of_the_formatter() -> None:
+    import time
+
+    class Formatter(log21.ColorizingFormatter):
+
+        def formatTime(self, record, datefmt=None) -> str:  # noqa: ANN001
+            return 'TIME'
+
+        def formatMessage(self, record) -> str:  # noqa: ANN001
+            return super().formatMessage(record).upper()
+
+    class Wrapping(log21.ColorizingFormatter):
+
+        def format(self, record) -> str:  # noqa: ANN001
+            return '<' + super().format(record).rstrip() + '>\n'
+
+    stream = io.StringIO()
+    handler = ColorizingStreamHandler(stream=stream, colorize=False)
+    logger = log21.Logger('test_plain_text_keeps_the_overrides', log21.DEBUG)
+    logger.addHandler(handler)
+
+    handler.setFormatter(Formatter('%(asctime)s %(message)s'))
+    logger.info('value')
+    handler.setFormatter(Wrapping('%(levelname)s %(message)s'))
+    logger.info('value')
+    formatter = log21.ColorizingFormatter('%(asctime)s %(message)s', datefmt='%H')
+    handler.setFormatter(formatter)
+    logger.info('value')
+    formatter.converter = time.gmtime
+    formatter.datefmt = '%Y'
+    logger.info('value')
+    assert stream.getvalue().splitlines() == [
+        'TIME VALUE', '<INFO value>',
+        time.strftime('%H value'), time.strftime('%Y value', time.gmtime())
+    ]
+    assert formatter.plain_formatter().converter is time.gmtime
+    formatter.default_msec_format = None
+    assert formatter.plain_formatter().default_msec_format is None
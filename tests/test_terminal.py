@@ -0,0 +1,32 @@
+import os
+import signal
+
+import pytest
+
+from log21 import terminal
+
+
+def test_resize_is_watched_only_on_request(monkeypatch) -> None:
+    if not hasattr(signal, 'SIGWINCH'):
+        pytest.skip('SIGWINCH is not available')
+    previous = signal.getsignal(signal.SIGWINCH)
+    calls = []
+    signal.signal(signal.SIGWINCH, lambda signum, frame: calls.append(signum))
+    try:
+        terminal.invalidate_terminal_size()
+        monkeypatch.setenv('COLUMNS', '100')
+        monkeypatch.setenv('LINES', '30')
+        assert terminal.get_terminal_size() == (100, 30)
+        assert signal.getsignal(signal.SIGWINCH) is not terminal._watcher
+
+        assert terminal.watch_resize()
+        monkeypatch.setenv('COLUMNS', '120')
+        # Cached until the terminal is resized
+        assert terminal.get_terminal_size() == (100, 30)
+        os.kill(os.getpid(), signal.SIGWINCH)
+        assert terminal.get_terminal_size() == (120, 30)
+        # The handler that was there before is still called
+        assert calls == [signal.SIGWINCH]
+    finally:
+        signal.signal(signal.SIGWINCH, previous)
+        terminal.invalidate_terminal_size()